@@ -26,21 +26,27 @@ from api.routers.approval_router import router as approval_router
 from api.routers.audit_router import router as audit_router
 from api.routers.settings_router import router as settings_router
 from api.routers.social_router import router as social_router
+from api.routers.search_router import router as search_router
+from api.utils.compression import CompressionMiddleware
+from api.utils.concurrency import shutdown_io
+from api.utils.payload import FastJSONResponse
 from api.websocket_manager import router as ws_router, start_watcher, stop_watcher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Start vault watcher on startup, stop on shutdown."""
+    """Start vault watcher on startup, stop it and the I/O executor on shutdown."""
     await start_watcher()
     yield
     await stop_watcher()
+    shutdown_io()
 
 
 app = FastAPI(
     title="WEBXES Tech Dashboard API",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS
@@ -57,6 +63,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for list payloads (outermost, so CORS headers are preserved)
+app.add_middleware(CompressionMiddleware)
+
 # Mount routers
 app.include_router(auth_router)
 app.include_router(dashboard_router)
@@ -65,6 +74,7 @@ app.include_router(approval_router)
 app.include_router(audit_router)
 app.include_router(settings_router)
 app.include_router(social_router)
+app.include_router(search_router)
 app.include_router(ws_router)
 
 
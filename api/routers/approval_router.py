@@ -5,29 +5,48 @@ List, view, edit, approve, and reject pending approvals.
 Moves files between Pending_Approval/ → Approved/ or Rejected/.
 """
 
+import os
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 
 from api.auth import verify_token
+from api.utils.concurrency import endpoint_limit, run_io
+from api.utils.http_cache import file_etag, is_not_modified, make_etag, not_modified, set_cache_headers
+from api.utils.payload import FastJSONResponse, parse_fields, select_fields
 from api.utils.file_parser import (
-    list_vault_files,
+    get_domain,
+    get_rel_path,
     parse_frontmatter,
+    query_vault_files,
     rebuild_file,
-    validate_vault_path,
+    resolve_file_id,
 )
+from api.utils.vault_counters import get_vault_counters
+from api.utils.vault_index import get_vault_index
 from config import PENDING_APPROVAL, APPROVED, REJECTED
 
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
-from audit_logger import audit_log
+from audit_logger import audit_log, audit_log_many
 
 router = APIRouter(prefix="/api/approvals", tags=["approvals"])
 
+# Worker pool size for bulk rewrite-and-move
+BULK_WORKERS = 8
+
+# action → (status, note metadata key, destination root)
+_DECISIONS = {
+    "approve": ("approved", "approval_note", APPROVED),
+    "reject": ("rejected", "rejection_note", REJECTED),
+}
+
 
 class ContentUpdate(BaseModel):
     content: str
@@ -37,155 +56,266 @@ class ApprovalAction(BaseModel):
     note: Optional[str] = ""
 
 
+class BulkAction(BaseModel):
+    action: Literal["approve", "reject"]
+    ids: Optional[list[str]] = None
+    domain: Optional[str] = None
+    older_than_hours: Optional[float] = None
+    sender: Optional[str] = None
+    note: Optional[str] = ""
+
+
+def _find_pending(item_id: str) -> Path:
+    """Resolve an approval ID to its file in Pending_Approval/ or 404."""
+    path = resolve_file_id(item_id, PENDING_APPROVAL)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Approval item not found")
+    return path
+
+
 @router.get("")
-def list_approvals(
+async def list_approvals(
+    request: Request,
     domain: Optional[str] = Query(None, description="Filter by domain (email, social_media, payments)"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields, e.g. filename,metadata.subject"),
     user: str = Depends(verify_token),
 ):
-    """List all pending approval items."""
-    items = list_vault_files(PENDING_APPROVAL)
-
-    if domain and domain != "all":
-        items = [i for i in items if i["domain"] == domain]
-
-    total = len(items)
-    start = (page - 1) * per_page
-    end = start + per_page
-
-    return {
-        "items": items[start:end],
+    """List all pending approval items.
+
+    Answers If-None-Match with 304 while the Pending_Approval index is unchanged.
+    ?fields= trims each item to the listed keys (see api.utils.payload).
+    """
+    try:
+        selection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async with endpoint_limit("read"):
+        version = await run_io(get_vault_index().version, PENDING_APPROVAL)
+        etag = make_etag("approvals", version, domain, page, per_page, fields)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        items, total = await run_io(
+            query_vault_files,
+            PENDING_APPROVAL,
+            domain=domain if domain and domain != "all" else None,
+            limit=per_page,
+            offset=(page - 1) * per_page,
+        )
+
+    response = FastJSONResponse({
+        "items": select_fields(items, selection),
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page if total > 0 else 0,
-    }
+    })
+    set_cache_headers(response, etag)
+    return response
 
 
-@router.get("/{item_id}")
-def get_approval(item_id: str, user: str = Depends(verify_token)):
-    """Get full content of a pending approval."""
-    items = list_vault_files(PENDING_APPROVAL)
-    match = next((i for i in items if i["id"] == item_id), None)
-    if not match:
+def _stat_pending(item_id: str) -> tuple[Path, os.stat_result]:
+    path = _find_pending(item_id)
+    try:
+        return path, path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Approval item not found")
 
-    path = validate_vault_path(match["path"])
+
+def _get_approval(item_id: str, path: Path) -> dict:
+    """Read a pending approval with its metadata and content."""
     metadata, content = parse_frontmatter(path)
 
     return {
         "id": item_id,
-        "filename": match["filename"],
-        "path": match["path"],
-        "domain": match["domain"],
+        "filename": path.name,
+        "path": get_rel_path(path),
+        "domain": get_domain(path),
         "metadata": metadata,
         "content": content,
-        "modified": match["modified"],
+        "modified": path.stat().st_mtime,
     }
 
 
-@router.put("/{item_id}/content")
-def update_content(item_id: str, body: ContentUpdate, user: str = Depends(verify_token)):
-    """Save edited content for a pending approval."""
-    items = list_vault_files(PENDING_APPROVAL)
-    match = next((i for i in items if i["id"] == item_id), None)
-    if not match:
-        raise HTTPException(status_code=404, detail="Approval item not found")
-
-    path = validate_vault_path(match["path"])
+@router.get("/{item_id}")
+async def get_approval(item_id: str, request: Request, response: Response, user: str = Depends(verify_token)):
+    """Get full content of a pending approval (304 if unchanged by mtime/size)."""
+    async with endpoint_limit("read"):
+        path, st = await run_io(_stat_pending, item_id)
+        etag = file_etag(st)
+        if is_not_modified(request, etag, st.st_mtime):
+            return not_modified(etag, st.st_mtime)
+        item = await run_io(_get_approval, item_id, path)
+    set_cache_headers(response, etag, st.st_mtime)
+    return item
+
+
+def _update_content(item_id: str, content: str) -> dict:
+    """Rewrite a pending approval's body, stamping the edit."""
+    path = _find_pending(item_id)
     metadata, _ = parse_frontmatter(path)
 
     # Update metadata with edit timestamp
     metadata["last_edited"] = datetime.now().isoformat()
     metadata["edited_by"] = "ceo_dashboard"
 
-    new_file = rebuild_file(metadata, body.content)
+    new_file = rebuild_file(metadata, content)
     path.write_text(new_file, encoding="utf-8")
+    get_vault_index().apply_change(path)
 
     audit_log("dashboard", "edit_approval", {
-        "file": match["filename"],
-        "domain": match["domain"],
+        "file": path.name,
+        "domain": get_domain(path),
     })
 
     return {"status": "saved", "id": item_id}
 
 
-@router.post("/{item_id}/approve")
-def approve_item(item_id: str, body: ApprovalAction = None, user: str = Depends(verify_token)):
-    """Approve an item — moves file from Pending_Approval to Approved."""
-    if body is None:
-        body = ApprovalAction()
+@router.put("/{item_id}/content")
+async def update_content(item_id: str, body: ContentUpdate, user: str = Depends(verify_token)):
+    """Save edited content for a pending approval."""
+    async with endpoint_limit("write"):
+        return await run_io(_update_content, item_id, body.content)
 
-    items = list_vault_files(PENDING_APPROVAL)
-    match = next((i for i in items if i["id"] == item_id), None)
-    if not match:
-        raise HTTPException(status_code=404, detail="Approval item not found")
 
-    src = validate_vault_path(match["path"])
-    domain = match["domain"]
+def _decide(src: Path, action: str, note: str = "") -> Path:
+    """Stamp the decision into a pending file and move it out.
+
+    Moves to Approved/<domain>/ or Rejected/<domain>/ and returns the destination.
+    """
+    status, note_key, dest_root = _DECISIONS[action]
+    domain = get_domain(src)
 
     # Update metadata
     metadata, content = parse_frontmatter(src)
-    metadata["status"] = "approved"
-    metadata["approved_at"] = datetime.now().isoformat()
-    metadata["approved_by"] = "ceo_dashboard"
-    if body.note:
-        metadata["approval_note"] = body.note
+    metadata["status"] = status
+    metadata[f"{status}_at"] = datetime.now().isoformat()
+    metadata[f"{status}_by"] = "ceo_dashboard"
+    if note:
+        metadata[note_key] = note
 
     new_file = rebuild_file(metadata, content)
     src.write_text(new_file, encoding="utf-8")
 
-    # Move to Approved/<domain>/
-    dest_dir = APPROVED / domain
+    dest_dir = dest_root / domain
     dest_dir.mkdir(parents=True, exist_ok=True)
     dest = dest_dir / src.name
     shutil.move(str(src), str(dest))
+    get_vault_index().remove(src)
+    get_vault_counters().apply_change(src)
+    return dest
+
+
+def _bulk_decide(body: BulkAction) -> dict:
+    """Resolve bulk targets, decide them in parallel and audit the results."""
+    # Resolve all targets in one pass
+    targets: list[tuple[str, Optional[Path]]] = []
+    if body.ids:
+        targets = [(item_id, resolve_file_id(item_id, PENDING_APPROVAL)) for item_id in dict.fromkeys(body.ids)]
+    else:
+        items, _ = query_vault_files(
+            PENDING_APPROVAL,
+            domain=body.domain if body.domain and body.domain != "all" else None,
+        )
+        cutoff = time.time() - body.older_than_hours * 3600 if body.older_than_hours is not None else None
+        sender = body.sender.lower() if body.sender else None
+        for item in items:
+            if cutoff is not None and item["modified"] > cutoff:
+                continue
+            if sender and not any(
+                sender in item["metadata"].get(k, "").lower() for k in ("from", "to")
+            ):
+                continue
+            targets.append((item["id"], PENDING_APPROVAL.parent / item["path"]))
+
+    def run(target: tuple[str, Optional[Path]]) -> dict:
+        item_id, src = target
+        if src is None:
+            return {"id": item_id, "status": "not_found"}
+        try:
+            dest = _decide(src, body.action, body.note)
+        except Exception as e:
+            return {"id": item_id, "status": "error", "file": src.name, "error": str(e)}
+        return {
+            "id": item_id,
+            "status": _DECISIONS[body.action][0],
+            "file": src.name,
+            "domain": get_domain(dest),
+            "moved_to": get_rel_path(dest),
+        }
+
+    with ThreadPoolExecutor(max_workers=BULK_WORKERS) as pool:
+        results = list(pool.map(run, targets))
+
+    audit_log_many([
+        {
+            "category": "dashboard",
+            "action": body.action,
+            "details": {"file": r["file"], "domain": r.get("domain", ""), "note": body.note, "bulk": True},
+            "status": "success" if "moved_to" in r else "error",
+            "error": r.get("error", ""),
+        }
+        for r in results if "file" in r
+    ])
+
+    succeeded = sum(1 for r in results if "moved_to" in r)
+    return {
+        "action": body.action,
+        "requested": len(targets),
+        "succeeded": succeeded,
+        "failed": len(targets) - succeeded,
+        "results": results,
+    }
 
-    audit_log("dashboard", "approve", {
-        "file": match["filename"],
-        "domain": domain,
-        "note": body.note,
-    })
 
-    return {"status": "approved", "id": item_id, "moved_to": str(dest.relative_to(APPROVED.parent))}
+@router.post("/bulk")
+async def bulk_decide(body: BulkAction, user: str = Depends(verify_token)):
+    """Approve or reject many items in one request.
 
+    Targets are either an explicit list of IDs or a filter over
+    Pending_Approval (domain, minimum age, sender). Files are rewritten
+    and moved on a bounded worker pool and all audit events are
+    appended in one write.
+    """
+    if not body.ids and not (body.domain or body.older_than_hours is not None or body.sender):
+        raise HTTPException(status_code=400, detail="Provide ids or at least one filter")
 
-@router.post("/{item_id}/reject")
-def reject_item(item_id: str, body: ApprovalAction = None, user: str = Depends(verify_token)):
-    """Reject an item — moves file from Pending_Approval to Rejected."""
-    if body is None:
-        body = ApprovalAction()
+    async with endpoint_limit("write"):
+        return await run_io(_bulk_decide, body)
 
-    items = list_vault_files(PENDING_APPROVAL)
-    match = next((i for i in items if i["id"] == item_id), None)
-    if not match:
-        raise HTTPException(status_code=404, detail="Approval item not found")
 
-    src = validate_vault_path(match["path"])
-    domain = match["domain"]
+def _decide_one(item_id: str, action: str, note: str) -> dict:
+    """Approve or reject a single pending item and audit it."""
+    src = _find_pending(item_id)
+    dest = _decide(src, action, note)
+    status, _, dest_root = _DECISIONS[action]
 
-    # Update metadata
-    metadata, content = parse_frontmatter(src)
-    metadata["status"] = "rejected"
-    metadata["rejected_at"] = datetime.now().isoformat()
-    metadata["rejected_by"] = "ceo_dashboard"
-    if body.note:
-        metadata["rejection_note"] = body.note
+    audit_log("dashboard", action, {
+        "file": src.name,
+        "domain": get_domain(dest),
+        "note": note,
+    })
 
-    new_file = rebuild_file(metadata, content)
-    src.write_text(new_file, encoding="utf-8")
+    return {"status": status, "id": item_id, "moved_to": str(dest.relative_to(dest_root.parent))}
 
-    # Move to Rejected/<domain>/
-    dest_dir = REJECTED / domain
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    dest = dest_dir / src.name
-    shutil.move(str(src), str(dest))
 
-    audit_log("dashboard", "reject", {
-        "file": match["filename"],
-        "domain": domain,
-        "note": body.note,
-    })
+@router.post("/{item_id}/approve")
+async def approve_item(item_id: str, body: ApprovalAction = None, user: str = Depends(verify_token)):
+    """Approve an item — moves file from Pending_Approval to Approved."""
+    if body is None:
+        body = ApprovalAction()
+
+    async with endpoint_limit("write"):
+        return await run_io(_decide_one, item_id, "approve", body.note)
+
+
+@router.post("/{item_id}/reject")
+async def reject_item(item_id: str, body: ApprovalAction = None, user: str = Depends(verify_token)):
+    """Reject an item — moves file from Pending_Approval to Rejected."""
+    if body is None:
+        body = ApprovalAction()
 
-    return {"status": "rejected", "id": item_id, "moved_to": str(dest.relative_to(REJECTED.parent))}
+    async with endpoint_limit("write"):
+        return await run_io(_decide_one, item_id, "reject", body.note)
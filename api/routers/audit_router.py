@@ -1,69 +1,82 @@
 """
 WEBXES Tech — Audit log router
 
-Query audit.jsonl with filters and get summaries.
+Query the indexed audit log with filters and get summaries.
 """
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from api.auth import verify_token
+from api.utils.concurrency import endpoint_limit, run_io
 
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
-from audit_logger import query_events, get_summary
+from audit_logger import query_page, get_summary, stream_events
 
 router = APIRouter(prefix="/api/audit", tags=["audit"])
 
 
 @router.get("")
-def list_audit_events(
+async def list_audit_events(
     category: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None, description="ISO date, e.g. 2026-02-01"),
     end_date: Optional[str] = Query(None, description="ISO date, e.g. 2026-02-28"),
     search: Optional[str] = Query(None, description="Search in action/details"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page"),
     page: int = Query(1, ge=1),
     per_page: int = Query(50, ge=1, le=200),
     user: str = Depends(verify_token),
 ):
-    """Query audit events with filters."""
-    events = query_events(category=category, start_date=start_date, end_date=end_date)
+    """Query audit events with filters, newest first.
 
-    # Additional filters not in audit_logger
-    if status:
-        events = [e for e in events if e.get("status") == status]
-    if search:
-        search_lower = search.lower()
-        events = [
-            e for e in events
-            if search_lower in e.get("action", "").lower()
-            or search_lower in str(e.get("details", "")).lower()
-        ]
-
-    # Reverse chronological
-    events.reverse()
-
-    total = len(events)
-    start = (page - 1) * per_page
-    end = start + per_page
+    Supports offset paging (page/per_page) and cursor paging (cursor).
+    """
+    try:
+        async with endpoint_limit("audit"):
+            result = await run_io(
+                query_page,
+                category=category, status=status, start_date=start_date,
+                end_date=end_date, search=search, cursor=cursor,
+                limit=per_page, offset=(page - 1) * per_page,
+            )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
+    total = result["total"]
     return {
-        "events": events[start:end],
+        "events": result["events"],
         "total": total,
         "page": page,
         "per_page": per_page,
-        "pages": (total + per_page - 1) // per_page if total > 0 else 0,
+        "pages": (total + per_page - 1) // per_page if total else 0,
+        "next_cursor": result["next_cursor"],
     }
 
 
 @router.get("/summary")
-def audit_summary(
+async def audit_summary(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     user: str = Depends(verify_token),
 ):
     """Get aggregated audit summary."""
-    return get_summary(start_date=start_date, end_date=end_date)
+    async with endpoint_limit("audit"):
+        return await run_io(get_summary, start_date=start_date, end_date=end_date)
+
+
+@router.get("/stream")
+async def audit_stream(
+    since: Optional[str] = Query(None, description="position from a previous call; omit to start at the end"),
+    user: str = Depends(verify_token),
+):
+    """Events appended since a position, oldest first, plus the next position."""
+    try:
+        async with endpoint_limit("audit"):
+            events, position = await run_io(stream_events, since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid position")
+    return {"events": events, "position": position}
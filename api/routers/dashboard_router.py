@@ -4,67 +4,46 @@ WEBXES Tech — Dashboard stats router
 GET /api/dashboard/stats — overview stats, timeline, service health.
 """
 
-import json
-from datetime import datetime, date
+import time
+from datetime import date, datetime
 from pathlib import Path
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
 from api.auth import verify_token
-from config import NEEDS_ACTION, PENDING_APPROVAL, DONE, LOGS
-
-router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+from api.utils.concurrency import endpoint_limit, run_io
+from api.utils.http_cache import is_not_modified, make_etag, not_modified, set_cache_headers
+from api.utils.vault_counters import get_vault_counters
+from config import LOGS
 
+import sys
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from audit_logger import recent_events, recent_version
 
-def _count_files(directory: Path) -> int:
-    """Count markdown files in a directory recursively."""
-    if not directory.exists():
-        return 0
-    return sum(1 for _ in directory.rglob("*.md"))
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
+SERVICE_LOGS = {
+    "gmail_watcher": LOGS / "gmail_watcher.log",
+    "orchestrator": LOGS / "orchestrator.log",
+    "cloud_agent": LOGS / "cloud_agent.log",
+    "health_monitor": LOGS / "health_monitor.log",
+    "approval_watcher": LOGS / "approval_watcher.log",
+}
 
-def _count_today(directory: Path) -> int:
-    """Count files modified today."""
-    if not directory.exists():
-        return 0
-    today = date.today().isoformat()
-    count = 0
-    for f in directory.rglob("*.md"):
-        mtime = datetime.fromtimestamp(f.stat().st_mtime).date().isoformat()
-        if mtime == today:
-            count += 1
-    return count
+# Service ages are reported to 0.1 min, so cached stats revalidate on this grid (s)
+HEALTH_RESOLUTION = 6
 
 
 def _recent_audit_events(n: int = 20) -> list[dict]:
-    """Read last N events from audit.jsonl."""
-    audit_file = LOGS / "audit.jsonl"
-    if not audit_file.exists():
-        return []
-    events = []
-    with open(audit_file, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try:
-                    events.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
-    return events[-n:]
+    """Last N audit events from the audit store's recent-events buffer."""
+    return recent_events(n)
 
 
 def _service_health() -> list[dict]:
     """Check log file recency as a proxy for service health."""
-    log_files = {
-        "gmail_watcher": LOGS / "gmail_watcher.log",
-        "orchestrator": LOGS / "orchestrator.log",
-        "cloud_agent": LOGS / "cloud_agent.log",
-        "health_monitor": LOGS / "health_monitor.log",
-        "approval_watcher": LOGS / "approval_watcher.log",
-    }
     services = []
     now = datetime.now().timestamp()
-    for name, log_path in log_files.items():
+    for name, log_path in SERVICE_LOGS.items():
         if log_path.exists():
             age_minutes = (now - log_path.stat().st_mtime) / 60
             services.append({
@@ -81,13 +60,44 @@ def _service_health() -> list[dict]:
     return services
 
 
-@router.get("/stats")
-def dashboard_stats(user: str = Depends(verify_token)):
-    """Get dashboard overview stats."""
+def _stats_version() -> str:
+    """ETag for the stats payload from counter/audit versions and log mtimes."""
+    log_mtimes = []
+    for log_path in SERVICE_LOGS.values():
+        try:
+            log_mtimes.append(log_path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            log_mtimes.append(None)
+    return make_etag(
+        "stats",
+        get_vault_counters().version(),
+        date.today(),
+        recent_version(),
+        log_mtimes,
+        int(time.time() // HEALTH_RESOLUTION),
+    )
+
+
+def _stats() -> dict:
+    """Assemble the stats payload (counters, timeline, service health)."""
     return {
-        "pending_tasks": _count_files(NEEDS_ACTION),
-        "approvals_waiting": _count_files(PENDING_APPROVAL),
-        "done_today": _count_today(DONE),
+        **get_vault_counters().snapshot(),
         "timeline": _recent_audit_events(20),
         "services": _service_health(),
     }
+
+
+@router.get("/stats")
+async def dashboard_stats(request: Request, response: Response, user: str = Depends(verify_token)):
+    """Get dashboard overview stats.
+
+    Counts come from the live vault counters (no folder walk per request),
+    and unchanged stats are answered with 304.
+    """
+    async with endpoint_limit("read"):
+        etag = await run_io(_stats_version)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        stats = await run_io(_stats)
+    set_cache_headers(response, etag)
+    return stats
@@ -4,66 +4,107 @@ WEBXES Tech — Inbox router
 List and view Needs_Action items with filtering and pagination.
 """
 
+import os
+from pathlib import Path
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from api.auth import verify_token
-from api.utils.file_parser import list_vault_files, parse_frontmatter, get_file_id, validate_vault_path
+from api.utils.concurrency import endpoint_limit, run_io
+from api.utils.http_cache import file_etag, is_not_modified, make_etag, not_modified, set_cache_headers
+from api.utils.payload import FastJSONResponse, parse_fields, select_fields
+from api.utils.file_parser import (
+    get_domain,
+    get_rel_path,
+    parse_frontmatter,
+    query_vault_files,
+    resolve_file_id,
+)
+from api.utils.vault_index import get_vault_index
 from config import NEEDS_ACTION
 
 router = APIRouter(prefix="/api/inbox", tags=["inbox"])
 
 
 @router.get("")
-def list_inbox(
+async def list_inbox(
+    request: Request,
     type: Optional[str] = Query(None, description="Filter by type (email, task, briefing)"),
     priority: Optional[str] = Query(None, description="Filter by priority"),
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields, e.g. filename,metadata.subject"),
     user: str = Depends(verify_token),
 ):
-    """List Needs_Action items with optional filters."""
-    items = list_vault_files(NEEDS_ACTION)
+    """List Needs_Action items with optional filters.
 
-    # Apply filters
-    if type:
-        items = [i for i in items if i["metadata"].get("type", "").lower() == type.lower()]
-    if priority:
-        items = [i for i in items if i["metadata"].get("priority", "").lower() == priority.lower()]
+    Answers If-None-Match with 304 while the Needs_Action index is unchanged.
+    ?fields= trims each item to the listed keys (see api.utils.payload).
+    """
+    try:
+        selection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Pagination
-    total = len(items)
-    start = (page - 1) * per_page
-    end = start + per_page
+    async with endpoint_limit("read"):
+        version = await run_io(get_vault_index().version, NEEDS_ACTION)
+        etag = make_etag("inbox", version, type, priority, page, per_page, fields)
+        if is_not_modified(request, etag):
+            return not_modified(etag)
+        items, total = await run_io(
+            query_vault_files,
+            NEEDS_ACTION,
+            type=type,
+            priority=priority,
+            limit=per_page,
+            offset=(page - 1) * per_page,
+        )
 
-    return {
-        "items": items[start:end],
+    response = FastJSONResponse({
+        "items": select_fields(items, selection),
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page if total > 0 else 0,
-    }
+    })
+    set_cache_headers(response, etag)
+    return response
 
 
-@router.get("/{item_id}")
-def get_inbox_item(item_id: str, user: str = Depends(verify_token)):
-    """Get full content of a Needs_Action item."""
-    # Find the file
-    items = list_vault_files(NEEDS_ACTION)
-    match = next((i for i in items if i["id"] == item_id), None)
-    if not match:
-        raise HTTPException(status_code=404, detail="Item not found")
-
-    path = validate_vault_path(match["path"])
+def _stat_item(item_id: str) -> tuple[Path, os.stat_result]:
+    path = resolve_file_id(item_id, NEEDS_ACTION)
+    try:
+        if path is not None:
+            return path, path.stat()
+    except FileNotFoundError:
+        pass
+    raise HTTPException(status_code=404, detail="Item not found")
+
+
+def _get_inbox_item(item_id: str, path: Path) -> dict:
+    """Read a Needs_Action item with its metadata and content."""
     metadata, content = parse_frontmatter(path)
 
     return {
         "id": item_id,
-        "filename": match["filename"],
-        "path": match["path"],
-        "domain": match["domain"],
+        "filename": path.name,
+        "path": get_rel_path(path),
+        "domain": get_domain(path),
         "metadata": metadata,
         "content": content,
-        "modified": match["modified"],
+        "modified": path.stat().st_mtime,
     }
+
+
+@router.get("/{item_id}")
+async def get_inbox_item(item_id: str, request: Request, response: Response, user: str = Depends(verify_token)):
+    """Get full content of a Needs_Action item (304 if unchanged by mtime/size)."""
+    async with endpoint_limit("read"):
+        path, st = await run_io(_stat_item, item_id)
+        etag = file_etag(st)
+        if is_not_modified(request, etag, st.st_mtime):
+            return not_modified(etag, st.st_mtime)
+        item = await run_io(_get_inbox_item, item_id, path)
+    set_cache_headers(response, etag, st.st_mtime)
+    return item
@@ -0,0 +1,79 @@
+"""
+WEBXES Tech — Vault search router
+
+GET /api/search — full-text and field search over Needs_Action/,
+Pending_Approval/ and Done/, backed by the vault index's FTS table.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from api.auth import verify_token
+from api.utils.concurrency import endpoint_limit, run_io
+from api.utils.payload import FastJSONResponse, parse_fields, select_fields
+from api.utils.vault_index import get_vault_index
+from config import NEEDS_ACTION, PENDING_APPROVAL, DONE
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+# Searchable folders by query name
+SEARCH_FOLDERS = {
+    "needs_action": NEEDS_ACTION,
+    "pending_approval": PENDING_APPROVAL,
+    "done": DONE,
+}
+
+
+def _timestamp(value: Optional[str], name: str) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected ISO date/time")
+
+
+@router.get("")
+async def search_vault(
+    q: Optional[str] = Query(None, description='Words (prefix match) or "quoted phrases"'),
+    folder: Optional[str] = Query(None, description="Comma-separated: needs_action, pending_approval, done"),
+    domain: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    priority: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    sender: Optional[str] = Query(None, description="Substring of the from/to field"),
+    subject: Optional[str] = Query(None, description="Substring of the subject"),
+    modified_after: Optional[str] = Query(None, description="ISO date, e.g. 2026-02-01"),
+    modified_before: Optional[str] = Query(None, description="ISO date, e.g. 2026-02-28"),
+    sort: str = Query("-modified", description="modified, filename, subject, priority or relevance; prefix - for descending"),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page"),
+    per_page: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields, e.g. filename,highlights"),
+    user: str = Depends(verify_token),
+):
+    """Search vault items with field filters, sorting and highlighted matches."""
+    names = [n.strip().lower() for n in folder.split(",") if n.strip()] if folder else list(SEARCH_FOLDERS)
+    unknown = [n for n in names if n not in SEARCH_FOLDERS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown folder: {', '.join(unknown)}")
+
+    try:
+        selection = parse_fields(fields)
+        async with endpoint_limit("read"):
+            result = await run_io(
+                get_vault_index().search,
+                [SEARCH_FOLDERS[n] for n in names],
+                q=q, domain=domain if domain and domain != "all" else None,
+                type=type, priority=priority, status=status,
+                sender=sender, subject=subject,
+                modified_after=_timestamp(modified_after, "modified_after"),
+                modified_before=_timestamp(modified_before, "modified_before"),
+                sort=sort, cursor=cursor, limit=per_page,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result["items"] = select_fields(result["items"], selection)
+    # Index rows are plain JSON already — skip FastAPI's jsonable_encoder pass
+    return FastJSONResponse(result)
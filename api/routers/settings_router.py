@@ -11,6 +11,7 @@ from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
 from api.auth import verify_token
+from api.utils.concurrency import endpoint_limit, run_io
 from config import VAULT_PATH, WORK_ZONE, IS_CLOUD, DRY_RUN
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
@@ -25,7 +26,7 @@ def _get_env_path() -> Path:
 
 
 @router.get("")
-def get_settings(user: str = Depends(verify_token)):
+async def get_settings(user: str = Depends(verify_token)):
     """Get current configuration."""
     return {
         "dry_run": DRY_RUN,
@@ -35,15 +36,14 @@ def get_settings(user: str = Depends(verify_token)):
     }
 
 
-@router.put("/dry-run")
-def toggle_dry_run(body: DryRunUpdate, user: str = Depends(verify_token)):
-    """Toggle DRY_RUN in .env file."""
+def _write_dry_run(enabled: bool) -> dict:
+    """Persist DRY_RUN to .env and the running process."""
     env_path = _get_env_path()
     if not env_path.exists():
         return {"error": ".env file not found"}
 
     content = env_path.read_text(encoding="utf-8")
-    new_value = "true" if body.enabled else "false"
+    new_value = "true" if enabled else "false"
 
     if "DRY_RUN=" in content:
         lines = content.split("\n")
@@ -60,4 +60,11 @@ def toggle_dry_run(body: DryRunUpdate, user: str = Depends(verify_token)):
     # Update runtime
     os.environ["DRY_RUN"] = new_value
 
-    return {"dry_run": body.enabled, "status": "updated"}
+    return {"dry_run": enabled, "status": "updated"}
+
+
+@router.put("/dry-run")
+async def toggle_dry_run(body: DryRunUpdate, user: str = Depends(verify_token)):
+    """Toggle DRY_RUN in .env file."""
+    async with endpoint_limit("write"):
+        return await run_io(_write_dry_run, body.enabled)
@@ -5,8 +5,13 @@ POST /api/social/generate
 Accepts a natural language message (e.g. "LinkedIn post about web design"),
 calls Gemini API to generate the post, writes it to Pending_Approval/social_media/,
 and returns the draft for immediate display on the dashboard.
+
+The Gemini call uses the async client with a timeout (GEMINI_TIMEOUT) under
+the "llm" concurrency limit, so slow generations never tie up the threads
+that serve approvals and listings.
 """
 
+import asyncio
 import hashlib
 import os
 import re
@@ -17,7 +22,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from api.auth import verify_token
+from api.utils.concurrency import endpoint_limit, run_io
 from api.utils.file_parser import rebuild_file, get_file_id
+from api.utils.vault_counters import get_vault_counters
+from api.utils.vault_index import get_vault_index
 
 import sys
 from pathlib import Path
@@ -29,6 +37,9 @@ router = APIRouter(prefix="/api/social", tags=["social"])
 
 SUPPORTED_PLATFORMS = ["linkedin", "facebook", "instagram", "twitter"]
 
+# Seconds to wait for Gemini before giving up
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+
 SYSTEM_PROMPT = """You are the social media content writer for WEBXES Tech, a digital agency.
 Write engaging, professional social media posts.
 Rules:
@@ -78,8 +89,21 @@ def _extract_topic(message: str, platform: str) -> str:
     return topic if topic else message
 
 
+def _save_draft(filename: str, file_content: str, audit_details: dict) -> Path:
+    """Write a generated draft to Pending_Approval/social_media/ and audit it."""
+    dest_dir = PENDING_APPROVAL / "social_media"
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    dest_path = dest_dir / filename
+    dest_path.write_text(file_content, encoding="utf-8")
+    get_vault_index().apply_change(dest_path)
+    get_vault_counters().apply_change(dest_path)
+
+    audit_log("social_media", "generated", audit_details)
+    return dest_path
+
+
 @router.post("/generate", response_model=GenerateResponse)
-def generate_social_post(body: GenerateRequest, user: str = Depends(verify_token)):
+async def generate_social_post(body: GenerateRequest, user: str = Depends(verify_token)):
     """Generate a social media post using Gemini API and save to Pending_Approval."""
     message = body.message.strip()
     if not message:
@@ -95,13 +119,20 @@ def generate_social_post(body: GenerateRequest, user: str = Depends(verify_token
 
     try:
         client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-lite",
-            contents=f"{SYSTEM_PROMPT}\n\nWrite a {platform} post about: {topic}",
-        )
+        async with endpoint_limit("llm"):
+            response = await asyncio.wait_for(
+                client.aio.models.generate_content(
+                    model="gemini-2.0-flash-lite",
+                    contents=f"{SYSTEM_PROMPT}\n\nWrite a {platform} post about: {topic}",
+                ),
+                timeout=GEMINI_TIMEOUT,
+            )
         post_content = response.text.strip()
+    except asyncio.TimeoutError:
+        await run_io(audit_log, "social_media", "generate_failed", {"platform": platform, "topic": topic}, status="error", error="timeout")
+        raise HTTPException(status_code=504, detail=f"AI generation timed out after {GEMINI_TIMEOUT:.0f}s")
     except Exception as e:
-        audit_log("social_media", "generate_failed", {"platform": platform, "topic": topic}, status="error", error=str(e))
+        await run_io(audit_log, "social_media", "generate_failed", {"platform": platform, "topic": topic}, status="error", error=str(e))
         raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
 
     # Build approval file
@@ -141,19 +172,13 @@ def generate_social_post(body: GenerateRequest, user: str = Depends(verify_token
 """
 
     file_content = rebuild_file(metadata, body_text)
-
-    # Write to Pending_Approval/social_media/
-    dest_dir = PENDING_APPROVAL / "social_media"
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    dest_path = dest_dir / filename
-    dest_path.write_text(file_content, encoding="utf-8")
-
-    audit_log("social_media", "generated", {
-        "platform": platform,
-        "topic": topic,
-        "file": filename,
-        "source": "ceo_dashboard",
-    })
+    async with endpoint_limit("write"):
+        dest_path = await run_io(_save_draft, filename, file_content, {
+            "platform": platform,
+            "topic": topic,
+            "file": filename,
+            "source": "ceo_dashboard",
+        })
 
     return GenerateResponse(
         id=get_file_id(dest_path),
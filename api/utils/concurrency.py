@@ -0,0 +1,65 @@
+"""
+WEBXES Tech — Async execution helpers for the dashboard API
+
+Routers are async; anything that blocks (vault reads/writes, SQLite index
+queries, audit appends) runs on one bounded file-I/O executor via run_io()
+instead of Starlette's shared threadpool.
+
+Each endpoint class also has its own concurrency limit, so one class
+cannot starve another — e.g. slow Gemini generations ("llm") never hold
+up an approve click ("write"):
+
+    async with endpoint_limit("write"):
+        return await run_io(_approve, item_id)
+
+Limits are configurable with API_LIMIT_<CLASS> env vars, the executor
+size with API_IO_WORKERS.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Optional
+
+IO_WORKERS = int(os.getenv("API_IO_WORKERS", "16"))
+
+# Endpoint class → max requests of that class in flight at once
+ENDPOINT_LIMITS = {
+    "read": int(os.getenv("API_LIMIT_READ", "32")),
+    "write": int(os.getenv("API_LIMIT_WRITE", "8")),
+    "audit": int(os.getenv("API_LIMIT_AUDIT", "4")),
+    "llm": int(os.getenv("API_LIMIT_LLM", "2")),
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+async def run_io(func, *args, **kwargs):
+    """Run a blocking call on the file-I/O executor and await its result."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="vault-io")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+@asynccontextmanager
+async def endpoint_limit(kind: str):
+    """Hold one of the concurrency slots for an endpoint class."""
+    sem = _semaphores.get(kind)
+    if sem is None:
+        sem = _semaphores[kind] = asyncio.Semaphore(ENDPOINT_LIMITS[kind])
+    async with sem:
+        yield
+
+
+def shutdown_io():
+    """Stop the file-I/O executor (waits for running jobs)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    _semaphores.clear()
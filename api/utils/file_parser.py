@@ -5,10 +5,11 @@ Parses markdown files with YAML frontmatter, extracts editable content,
 and validates file paths against directory traversal.
 """
 
-import re
 from pathlib import Path
+from typing import Optional
 
 from config import VAULT_PATH
+from vault_document import read_document
 
 
 def validate_vault_path(path_str: str) -> Path:
@@ -27,32 +28,11 @@ def validate_vault_path(path_str: str) -> Path:
 def parse_frontmatter(path: Path) -> tuple[dict, str]:
     """Parse a markdown file with YAML-style frontmatter.
 
-    Returns (metadata_dict, content_body).
-    Frontmatter is delimited by --- lines at the top.
+    Returns (metadata_dict, content_body). Uses the shared streaming
+    parser in vault_document; see there for the accepted grammar.
     """
-    text = path.read_text(encoding="utf-8")
-
-    if not text.startswith("---"):
-        return {}, text
-
-    # Find closing ---
-    end_match = re.search(r"\n---\s*\n", text[3:])
-    if not end_match:
-        return {}, text
-
-    front_end = end_match.end() + 3
-    front_text = text[3:front_end - 4].strip()
-    body = text[front_end:].strip()
-
-    # Parse simple key: value frontmatter
-    metadata = {}
-    for line in front_text.split("\n"):
-        line = line.strip()
-        if ":" in line:
-            key, _, value = line.partition(":")
-            metadata[key.strip()] = value.strip()
-
-    return metadata, body
+    doc = read_document(path)
+    return doc.metadata, doc.body
 
 
 def extract_editable_content(content: str, action_type: str = "") -> str:
@@ -104,32 +84,67 @@ def get_file_id(path: Path) -> str:
         return path.stem
 
 
+def get_rel_path(path: Path) -> str:
+    """Return the vault-relative path of a file with forward slashes."""
+    return str(path.resolve().relative_to(VAULT_PATH.resolve())).replace("\\", "/")
+
+
+def get_domain(path: Path) -> str:
+    """Return the domain subfolder of a vault file (e.g. email), or general."""
+    parts = get_rel_path(path).split("/")
+    return parts[1] if len(parts) > 2 else "general"
+
+
 def id_to_path(file_id: str) -> Path:
-    """Convert a file ID back to a vault path."""
-    rel_path = file_id.replace("__", "/").replace("_", " ")
-    return VAULT_PATH / rel_path
+    """Convert a file ID back to a vault path.
+
+    IDs decode directly when the original path has no spaces or double
+    underscores (one stat). Anything else is looked up in the vault index.
+    """
+    candidate = VAULT_PATH / file_id.replace("__", "/")
+    if candidate.is_file():
+        return candidate
+
+    from api.utils.vault_index import get_vault_index
+    rel = get_vault_index().path_for_id(file_id)
+    return VAULT_PATH / rel if rel else candidate
+
 
+def resolve_file_id(file_id: str, directory: Path) -> Optional[Path]:
+    """Resolve a file ID to an existing file inside directory, or None.
 
-def list_vault_files(directory: Path, pattern: str = "*.md") -> list[dict]:
-    """List markdown files in a vault directory with metadata."""
+    Touches only the one target file — no directory listing.
+    """
+    path = id_to_path(file_id).resolve()
+    try:
+        path.relative_to(directory.resolve())
+    except ValueError:
+        return None
+    return path if path.is_file() else None
+
+
+def query_vault_files(directory: Path, domain: str = None, type: str = None,
+                      priority: str = None, limit: int = None,
+                      offset: int = 0) -> tuple[list[dict], int]:
+    """Query indexed markdown files in a vault directory, newest first.
+
+    Returns (items, total) where total counts all matches before LIMIT/OFFSET.
+    """
     if not directory.exists():
-        return []
-
-    files = []
-    for f in sorted(directory.rglob(pattern), key=lambda p: p.stat().st_mtime, reverse=True):
-        metadata, body = parse_frontmatter(f)
-        rel_path = f.relative_to(VAULT_PATH)
-        # Determine subdomain from path
-        parts = rel_path.parts
-        domain = parts[1] if len(parts) > 2 else "general"
-
-        files.append({
-            "id": get_file_id(f),
-            "filename": f.name,
-            "path": str(rel_path).replace("\\", "/"),
-            "domain": domain,
-            "metadata": metadata,
-            "preview": body[:200] if body else "",
-            "modified": f.stat().st_mtime,
-        })
-    return files
+        return [], 0
+
+    from api.utils.vault_index import get_vault_index
+    return get_vault_index().query(
+        directory, domain=domain, type=type, priority=priority,
+        limit=limit, offset=offset,
+    )
+
+
+def list_vault_files(directory: Path) -> list[dict]:
+    """List markdown files in a vault directory with metadata.
+
+    The first call for a directory builds its index with a parallel scan
+    (see VaultIndex.reconcile); later calls are indexed queries.
+    """
+    items, _ = query_vault_files(directory)
+    return items
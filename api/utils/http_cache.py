@@ -0,0 +1,79 @@
+"""
+WEBXES Tech — Conditional GET helpers
+
+Endpoints compute a cheap version for what they would return (index
+generation, file mtime/size, ...) before doing any real work, turn it into
+an ETag, and answer If-None-Match / If-Modified-Since with 304 when the
+client already has it:
+
+    etag = make_etag("approvals", index.version(PENDING_APPROVAL), page)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    ...
+    set_cache_headers(response, etag)
+
+Responses are marked "private, no-cache", so browsers keep them but always
+revalidate — the dashboard's refetches become 304s with no body.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag from the parts that determine a response."""
+    digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def file_etag(st) -> str:
+    """Weak ETag for a single file from its stat result."""
+    return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _http_date(timestamp: float) -> str:
+    return format_datetime(datetime.fromtimestamp(int(timestamp), tz=timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """True if the request's validators show the client copy is current.
+
+    If-None-Match wins over If-Modified-Since, as in RFC 9110.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: ignore W/ prefixes
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= since
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[float] = None):
+    """Attach ETag / Last-Modified / Cache-Control to a response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+
+
+def not_modified(etag: str, last_modified: Optional[float] = None) -> Response:
+    """Empty 304 response carrying the current validators."""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, last_modified)
+    return response
@@ -0,0 +1,91 @@
+"""
+WEBXES Tech — Compact list payloads
+
+Field selection for listing endpoints and the API's default JSON response
+class.
+
+    ?fields=filename,modified,metadata.subject,metadata.from
+
+keeps only those keys on each item (plus "id", which the dashboard needs to
+open an item). "metadata.<key>" picks single frontmatter keys instead of
+the whole dict; "metadata" alone keeps all of it. Without ?fields= items
+are returned in full, as before.
+
+Responses are encoded with orjson when it is installed, falling back to a
+compact stdlib json.dumps.
+"""
+
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# Top-level keys a list item can carry (search items add folder/highlights)
+ITEM_FIELDS = {"id", "filename", "path", "folder", "domain", "metadata", "preview", "modified", "highlights"}
+
+
+class FieldSelection:
+    """Parsed ?fields= value: top-level keys plus selected metadata keys."""
+
+    def __init__(self, keys: set[str], metadata_keys: Optional[list[str]]):
+        self.keys = keys
+        # None → whole metadata dict (if "metadata" is in keys)
+        self.metadata_keys = metadata_keys
+
+    def apply(self, item: dict) -> dict:
+        out = {k: item[k] for k in self.keys if k in item}
+        if self.metadata_keys is not None:
+            metadata = item.get("metadata") or {}
+            out["metadata"] = {k: metadata[k] for k in self.metadata_keys if k in metadata}
+        return out
+
+
+def parse_fields(fields: Optional[str]) -> Optional[FieldSelection]:
+    """Parse a comma-separated ?fields= value, or None for full items.
+
+    Raises ValueError for unknown top-level fields.
+    """
+    if not fields:
+        return None
+    keys = {"id"}
+    metadata_keys: list[str] = []
+    whole_metadata = False
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        if name.startswith("metadata."):
+            metadata_keys.append(name[len("metadata."):])
+        elif name in ITEM_FIELDS:
+            keys.add(name)
+            whole_metadata |= name == "metadata"
+        else:
+            raise ValueError(f"Unknown field: {name}")
+    if whole_metadata or not metadata_keys:
+        return FieldSelection(keys, None)
+    return FieldSelection(keys, metadata_keys)
+
+
+def select_fields(items: list[dict], selection: Optional[FieldSelection]) -> list[dict]:
+    """Apply a field selection to list items (no-op when selection is None)."""
+    if selection is None:
+        return items
+    return [selection.apply(item) for item in items]
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse using dumps() — orjson if installed, compact json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,165 @@
+"""
+WEBXES Tech — Live vault counters for the dashboard
+
+Keeps pending (Needs_Action/), waiting (Pending_Approval/) and done-today
+(Done/, by mtime) counts in memory, with per-domain breakdowns, so
+/api/dashboard/stats never walks the vault.
+
+Counts are updated per file from vault index change notifications (fed by
+the WebSocket folder watcher and by routers that move files) and fully
+reconciled on a slow timer. Done is counted per calendar day, so the
+midnight rollover needs no reset — "today" is looked up when asked.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from api.utils.file_parser import get_domain, get_rel_path
+from config import NEEDS_ACTION, PENDING_APPROVAL, DONE
+
+# Full rescan interval while the folder watcher is feeding events,
+# and while it is paused (no dashboard connected)
+RECONCILE_INTERVAL_LIVE = float(os.getenv("COUNTERS_RECONCILE_LIVE", "300"))
+RECONCILE_INTERVAL_IDLE = float(os.getenv("COUNTERS_RECONCILE_IDLE", "15"))
+
+_FOLDERS = {
+    "pending_tasks": NEEDS_ACTION,
+    "approvals_waiting": PENDING_APPROVAL,
+    "done": DONE,
+}
+
+
+def _day(mtime: float) -> str:
+    return date.fromtimestamp(mtime).isoformat()
+
+
+class VaultCounters:
+    """In-memory file counts for the dashboard folders."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # rel path → (counter name, domain, day) for every tracked file
+        self._files: dict[str, tuple[str, str, str]] = {}
+        self._by_domain: dict[str, Counter] = {name: Counter() for name in _FOLDERS}
+        self._done_by_day: Counter = Counter()
+        self._done_by_day_domain: Counter = Counter()
+        self._last_reconcile: Optional[float] = None
+        self.live = False
+        # Bumped on every change; with the nonce, backs version()
+        self.generation = 0
+        self._nonce = uuid.uuid4().hex[:8]
+
+    def _classify(self, path: Path) -> Optional[str]:
+        for name, root in _FOLDERS.items():
+            if root.resolve() in path.resolve().parents:
+                return name
+        return None
+
+    def _add(self, rel: str, entry: tuple[str, str, str]):
+        name, domain, day = entry
+        self._files[rel] = entry
+        self._by_domain[name][domain] += 1
+        if name == "done":
+            self._done_by_day[day] += 1
+            self._done_by_day_domain[(day, domain)] += 1
+
+    def _discard(self, rel: str):
+        entry = self._files.pop(rel, None)
+        if entry is None:
+            return
+        name, domain, day = entry
+        self._by_domain[name][domain] -= 1
+        if name == "done":
+            self._done_by_day[day] -= 1
+            self._done_by_day_domain[(day, domain)] -= 1
+
+    def apply_change(self, path: Path):
+        """Update counts for one created, modified or deleted file."""
+        path = Path(path)
+        if path.suffix != ".md":
+            return
+        name = self._classify(path)
+        if name is None:
+            return
+        rel = get_rel_path(path)
+        try:
+            entry = (name, get_domain(path), _day(path.stat().st_mtime))
+        except FileNotFoundError:
+            entry = None
+        with self._lock:
+            self._discard(rel)
+            if entry is not None:
+                self._add(rel, entry)
+            self.generation += 1
+
+    def reconcile(self):
+        """Rebuild all counts from disk (stat-only)."""
+        fresh = VaultCounters()
+        for name, root in _FOLDERS.items():
+            if not root.exists():
+                continue
+            for f in root.rglob("*.md"):
+                try:
+                    fresh._add(get_rel_path(f), (name, get_domain(f), _day(f.stat().st_mtime)))
+                except FileNotFoundError:
+                    continue
+        with self._lock:
+            if fresh._files != self._files:
+                self.generation += 1
+            self._files = fresh._files
+            self._by_domain = fresh._by_domain
+            self._done_by_day = fresh._done_by_day
+            self._done_by_day_domain = fresh._done_by_day_domain
+            self._last_reconcile = time.monotonic()
+
+    def ensure_fresh(self):
+        """Reconcile if the counts may be stale."""
+        interval = RECONCILE_INTERVAL_LIVE if self.live else RECONCILE_INTERVAL_IDLE
+        if self._last_reconcile is None or time.monotonic() - self._last_reconcile > interval:
+            self.reconcile()
+
+    def version(self) -> str:
+        """Opaque version of the counts (excluding the day for done_today)."""
+        self.ensure_fresh()
+        return f"{self._nonce}.{self.generation}"
+
+    def snapshot(self) -> dict:
+        """Return current counts, reconciling first if they may be stale."""
+        self.ensure_fresh()
+
+        today = date.today().isoformat()
+        with self._lock:
+            done_today = {
+                domain: n for (day, domain), n in self._done_by_day_domain.items()
+                if day == today and n
+            }
+            return {
+                "pending_tasks": sum(self._by_domain["pending_tasks"].values()),
+                "approvals_waiting": sum(self._by_domain["approvals_waiting"].values()),
+                "done_today": self._done_by_day[today],
+                "by_domain": {
+                    "pending_tasks": {d: n for d, n in self._by_domain["pending_tasks"].items() if n},
+                    "approvals_waiting": {d: n for d, n in self._by_domain["approvals_waiting"].items() if n},
+                    "done_today": done_today,
+                },
+            }
+
+
+_counters: Optional[VaultCounters] = None
+_counters_lock = threading.Lock()
+
+
+def get_vault_counters() -> VaultCounters:
+    """Return the process-wide counters, creating them on first use."""
+    global _counters
+    if _counters is None:
+        with _counters_lock:
+            if _counters is None:
+                _counters = VaultCounters()
+    return _counters
@@ -0,0 +1,505 @@
+"""
+WEBXES Tech — Persistent vault index
+
+SQLite index of vault markdown files at Logs/vault_index.db, keyed by
+vault-relative path and tracking mtime/size. Each row holds the parsed
+frontmatter, domain and 200-char preview, so listings become indexed
+queries with LIMIT/OFFSET instead of reading every file.
+
+A files_fts table (FTS5, unicode61 with prefix indexes) holds the subject,
+sender/recipient, other frontmatter values and the full body of every
+indexed file, keyed by the files rowid, for search(). Bodies are read
+once per changed file, when its row is (re)built.
+
+The index is kept current two ways:
+  - apply_change(path) — called from the folder watcher and from routers
+    that move/rewrite files, re-parsing just that one file.
+  - reconcile(directory) — a stat-only pass (no file reads unless mtime or
+    size changed), run at most every RECONCILE_INTERVAL seconds per folder
+    as a safety net for missed events.
+
+The first reconcile of a folder (no index yet, or a schema rebuild) reads
+every file. On a local disk that is fastest serially. For a network or
+cloud-synced vault, VAULT_INDEX_SCAN_WORKERS > 1 sends the reads through a
+bounded thread pool so per-file latency overlaps. Rows are still written
+in sorted path order, so the result is the same as a serial scan.
+"""
+
+import base64
+import fnmatch
+import html
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from api.utils.file_parser import get_domain, get_file_id
+from config import VAULT_PATH, LOGS
+from vault_document import read_document
+
+logger = logging.getLogger("vault_index")
+
+INDEX_FILE = LOGS / "vault_index.db"
+RECONCILE_INTERVAL = float(os.getenv("VAULT_INDEX_RECONCILE", "15"))
+PREVIEW_CHARS = 200
+# Reader threads for reconcile. 1 (serial) suits local disks, where the pool
+# only adds overhead; batches smaller than SCAN_PARALLEL_MIN stay serial.
+SCAN_WORKERS = int(os.getenv("VAULT_INDEX_SCAN_WORKERS", "1"))
+SCAN_PARALLEL_MIN = 32
+# Bump when the schema changes; older indexes are emptied and rebuilt
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path      TEXT PRIMARY KEY,
+    id        TEXT NOT NULL,
+    folder    TEXT NOT NULL,
+    domain    TEXT NOT NULL,
+    filename  TEXT NOT NULL,
+    mtime     REAL NOT NULL,
+    size      INTEGER NOT NULL,
+    type      TEXT NOT NULL DEFAULT '',
+    priority  TEXT NOT NULL DEFAULT '',
+    status    TEXT NOT NULL DEFAULT '',
+    subject   TEXT NOT NULL DEFAULT '',
+    people    TEXT NOT NULL DEFAULT '',
+    metadata  TEXT NOT NULL,
+    preview   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_folder_mtime ON files(folder, mtime DESC);
+CREATE INDEX IF NOT EXISTS idx_files_folder_domain ON files(folder, domain, mtime DESC);
+CREATE INDEX IF NOT EXISTS idx_files_id ON files(id);
+-- Covers substring filters on sender/subject without reading whole rows
+CREATE INDEX IF NOT EXISTS idx_files_people ON files(folder, people, subject);
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+    subject, people, fields, body,
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+"""
+
+# search() sort keys → SQL expression over the files table (f)
+SORT_KEYS = {
+    "modified": "f.mtime",
+    "filename": "f.filename COLLATE NOCASE",
+    "subject": "f.subject COLLATE NOCASE",
+    "priority": "f.priority",
+    "relevance": "bm25(files_fts, 8.0, 4.0, 2.0, 1.0)",
+}
+
+# Frontmatter keys naming the other party, searchable via sender=
+_PEOPLE_KEYS = ("from", "to", "sender", "recipient")
+
+# Sentinels wrapped around matches by SQLite, swapped for <mark> after escaping
+_HL_OPEN, _HL_CLOSE = "\x02", "\x03"
+
+
+def _rel(path: Path) -> str:
+    """Vault-relative POSIX path string; ValueError if outside the vault."""
+    try:
+        rel = path.relative_to(VAULT_PATH)
+    except ValueError:
+        # Routers pass resolved paths; VAULT_PATH may be relative or a symlink
+        rel = path.resolve().relative_to(VAULT_PATH.resolve())
+    return str(rel).replace("\\", "/")
+
+
+class VaultIndex:
+    """SQLite-backed index of vault markdown files."""
+
+    def __init__(self, db_path: Path = INDEX_FILE):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Search scans touch most rows; keep them in memory rather than re-reading
+        self._conn.execute("PRAGMA cache_size=-32768")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Older layouts lack search columns — drop and re-index from disk
+            self._conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS files_fts;")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._last_reconcile: dict[str, float] = {}
+        # Per top-level folder change counters behind version(); the nonce
+        # keeps versions from repeating across restarts
+        self._generation: Counter = Counter()
+        self._nonce = uuid.uuid4().hex[:8]
+
+    # ── Writes ────────────────────────────────────────────────────────
+
+    def _row_for(self, path: Path, st: os.stat_result) -> tuple[tuple, tuple]:
+        """Build the files row and the files_fts text for one file."""
+        doc = read_document(path)
+        metadata = doc.metadata
+        rel = _rel(path)
+        subject = metadata.get("subject", "")
+        people = " ".join(v for k in _PEOPLE_KEYS if (v := metadata.get(k)))
+        fields = " ".join([path.name] + [
+            v for k, v in metadata.items() if k != "subject" and k not in _PEOPLE_KEYS
+        ])
+        text = (subject, people, fields, doc.body)
+        return (
+            rel,
+            get_file_id(path),
+            rel.split("/", 1)[0],
+            get_domain(path),
+            path.name,
+            st.st_mtime,
+            st.st_size,
+            metadata.get("type", "").lower(),
+            metadata.get("priority", "").lower(),
+            metadata.get("status", "").lower(),
+            subject,
+            people,
+            json.dumps(metadata),
+            doc.preview[:PREVIEW_CHARS],
+        ), text
+
+    def _try_row_for(self, item: tuple[str, Path, os.stat_result]) -> Optional[tuple[tuple, tuple]]:
+        rel, path, st = item
+        try:
+            return self._row_for(path, st)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not index {rel}: {e}")
+            return None
+
+    def _read_rows(self, items: list[tuple[str, Path, os.stat_result]]) -> list[tuple[tuple, tuple]]:
+        """Build rows for many files, in input order, in parallel if configured."""
+        if SCAN_WORKERS > 1 and len(items) >= SCAN_PARALLEL_MIN:
+            with ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="vault-scan") as pool:
+                rows = list(pool.map(self._try_row_for, items))
+        else:
+            rows = [self._try_row_for(item) for item in items]
+        return [row for row in rows if row is not None]
+
+    def _delete(self, rels: list[str]):
+        for rel in rels:
+            row = self._conn.execute("SELECT rowid FROM files WHERE path = ?", (rel,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM files_fts WHERE rowid = ?", row)
+                self._conn.execute("DELETE FROM files WHERE rowid = ?", row)
+                self._generation[rel.split("/", 1)[0]] += 1
+
+    def _upsert(self, rows: list[tuple[tuple, tuple]]):
+        self._delete([row[0] for row, _ in rows])
+        for row, text in rows:
+            self._generation[row[2]] += 1
+            cur = self._conn.execute(
+                "INSERT INTO files "
+                "(path, id, folder, domain, filename, mtime, size, type, priority, "
+                "status, subject, people, metadata, preview) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._conn.execute(
+                "INSERT INTO files_fts (rowid, subject, people, fields, body) VALUES (?, ?, ?, ?, ?)",
+                (cur.lastrowid, *text),
+            )
+
+    def apply_change(self, path: Path):
+        """Re-index a single file after a create/modify/delete event."""
+        path = Path(path)
+        try:
+            rel = _rel(path)
+        except ValueError:
+            logger.warning(f"Not indexing {path}: outside the vault")
+            return
+        try:
+            st = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            with self._lock:
+                self._delete([rel])
+                self._conn.commit()
+            return
+        try:
+            row = self._row_for(path, st)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not index {rel}: {e}")
+            return
+        with self._lock:
+            self._upsert([row])
+            self._conn.commit()
+
+    def remove(self, path: Path):
+        """Drop a file from the index (e.g. after moving it away)."""
+        self.apply_change(path)
+
+    def reconcile(self, directory: Path, pattern: str = "*.md"):
+        """Bring the index for one directory in line with disk.
+
+        Only files whose mtime or size changed are read and re-parsed, using
+        the stat results os.scandir already has.
+        """
+        prefix = _rel(directory)
+        on_disk: dict[str, tuple[Path, os.stat_result]] = {}
+        stack = [str(directory)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif fnmatch.fnmatch(entry.name, pattern):
+                            path = Path(entry.path)
+                            on_disk[_rel(path)] = (path, entry.stat())
+            except FileNotFoundError:
+                continue
+
+        with self._lock:
+            known = {
+                rel: (mtime, size)
+                for rel, mtime, size in self._conn.execute(
+                    "SELECT path, mtime, size FROM files WHERE path > ? AND path < ?",
+                    (prefix + "/", prefix + "0"),
+                )
+            }
+
+        changed = self._read_rows([
+            (rel, path, st) for rel, (path, st) in sorted(on_disk.items())
+            if known.get(rel) != (st.st_mtime, st.st_size)
+        ])
+        removed = [rel for rel in known if rel not in on_disk]
+
+        with self._lock:
+            if changed:
+                self._upsert(changed)
+            if removed:
+                self._delete(removed)
+            self._conn.commit()
+            self._last_reconcile[prefix] = time.monotonic()
+
+        if changed or removed:
+            logger.info(f"Reconciled {prefix}: {len(changed)} updated, {len(removed)} removed")
+
+    def ensure_fresh(self, directory: Path):
+        """Reconcile a directory if it hasn't been reconciled recently."""
+        last = self._last_reconcile.get(_rel(directory))
+        if last is None or time.monotonic() - last > RECONCILE_INTERVAL:
+            self.reconcile(directory)
+
+    # ── Reads ─────────────────────────────────────────────────────────
+
+    def version(self, directory: Path) -> str:
+        """Opaque version of a folder's index rows; changes whenever they do.
+
+        Reconciles first when due, like query(), so it is safe to use as a
+        listing's cache validator.
+        """
+        self.ensure_fresh(directory)
+        with self._lock:
+            return f"{self._nonce}.{self._generation[_rel(directory).split('/', 1)[0]]}"
+
+    def path_for_id(self, file_id: str) -> Optional[str]:
+        """Look up the vault-relative path for a file ID, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM files WHERE id = ? LIMIT 1", (file_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def query(self, directory: Path, domain: Optional[str] = None,
+              type: Optional[str] = None, priority: Optional[str] = None,
+              limit: Optional[int] = None, offset: int = 0) -> tuple[list[dict], int]:
+        """Return (items, total) for a directory, newest first."""
+        self.ensure_fresh(directory)
+
+        prefix = _rel(directory)
+        where = ["folder = ?"]
+        params: list = [prefix.split("/", 1)[0]]
+        if "/" in prefix:
+            where.append("path > ? AND path < ?")
+            params += [prefix + "/", prefix + "0"]
+        if domain:
+            where.append("domain = ?")
+            params.append(domain)
+        if type:
+            where.append("type = ?")
+            params.append(type.lower())
+        if priority:
+            where.append("priority = ?")
+            params.append(priority.lower())
+        clause = " AND ".join(where)
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM files WHERE {clause}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT id, filename, path, domain, metadata, preview, mtime FROM files "
+                f"WHERE {clause} ORDER BY mtime DESC, path LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, offset],
+            ).fetchall()
+
+        items = [
+            {
+                "id": file_id,
+                "filename": filename,
+                "path": path,
+                "domain": domain,
+                "metadata": json.loads(metadata),
+                "preview": preview,
+                "modified": mtime,
+            }
+            for file_id, filename, path, domain, metadata, preview, mtime in rows
+        ]
+        return items, total
+
+    def search(self, directories: list[Path], q: Optional[str] = None,
+               domain: Optional[str] = None, type: Optional[str] = None,
+               priority: Optional[str] = None, status: Optional[str] = None,
+               sender: Optional[str] = None, subject: Optional[str] = None,
+               modified_after: Optional[float] = None, modified_before: Optional[float] = None,
+               sort: str = "-modified", cursor: Optional[str] = None,
+               limit: int = 20) -> dict:
+        """Full-text and field search over top-level vault folders.
+
+        q matches words (prefix) or "quoted phrases" in subject, sender,
+        other frontmatter values and body. sort is a SORT_KEYS name, with
+        a leading - for descending (relevance is always best-first and
+        needs q). Returns {"items", "total", "next_cursor"}; raises
+        ValueError for a bad sort key or cursor.
+        """
+        match = _match_query(q) if q else None
+        key = sort.lstrip("-")
+        if key not in SORT_KEYS or (key == "relevance" and not match):
+            raise ValueError(f"Invalid sort: {sort}")
+        descending = sort.startswith("-") and key != "relevance"
+
+        for directory in directories:
+            self.ensure_fresh(directory)
+        join = "JOIN files_fts ON files_fts.rowid = f.rowid" if match else ""
+        where = [f"f.folder IN ({', '.join('?' * len(directories))})"]
+        params: list = [_rel(d) for d in directories]
+        if match:
+            where.append("files_fts MATCH ?")
+            params.append(match)
+        for column, value in (("domain", domain), ("type", type), ("priority", priority), ("status", status)):
+            if value:
+                where.append(f"f.{column} = ?")
+                params.append(value if column == "domain" else value.lower())
+        for column, value in (("people", sender), ("subject", subject)):
+            if value:
+                where.append(f"f.{column} LIKE ? ESCAPE '\\'")
+                params.append(_like(value))
+        if modified_after is not None:
+            where.append("f.mtime >= ?")
+            params.append(modified_after)
+        if modified_before is not None:
+            where.append("f.mtime < ?")
+            params.append(modified_before)
+        clause = " AND ".join(where)
+
+        columns = "f.id, f.filename, f.path, f.folder, f.domain, f.metadata, f.preview, f.mtime"
+        if match:
+            columns += (
+                f", highlight(files_fts, 0, '{_HL_OPEN}', '{_HL_CLOSE}')"
+                f", snippet(files_fts, 3, '{_HL_OPEN}', '{_HL_CLOSE}', '…', 16)"
+            )
+        else:
+            columns += ", NULL, NULL"
+
+        page_where, page_params = "", []
+        if cursor:
+            cursor_sort, after_key, after_path = decode_search_cursor(cursor)
+            if cursor_sort != sort:
+                raise ValueError("Cursor belongs to a different sort")
+            op = "<" if descending else ">"
+            page_where = f"WHERE (sort_key {op} ? OR (sort_key = ? AND path > ?))"
+            page_params = [after_key, after_key, after_path]
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM files f {join} WHERE {clause}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM (SELECT {columns}, {SORT_KEYS[key]} AS sort_key "
+                f"FROM files f {join} WHERE {clause}) {page_where} "
+                f"ORDER BY sort_key {'DESC' if descending else 'ASC'}, path LIMIT ?",
+                params + page_params + [limit + 1],
+            ).fetchall()
+
+        items = []
+        for file_id, filename, path, folder, domain_, metadata, preview, mtime, subj_hl, snip, _ in rows[:limit]:
+            item = {
+                "id": file_id,
+                "filename": filename,
+                "path": path,
+                "folder": folder,
+                "domain": domain_,
+                "metadata": json.loads(metadata),
+                "preview": preview,
+                "modified": mtime,
+            }
+            if match:
+                item["highlights"] = {"subject": _highlight(subj_hl), "body": _highlight(snip)}
+            items.append(item)
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_search_cursor(sort, last[-1], last[2])
+        return {"items": items, "total": total, "next_cursor": next_cursor}
+
+
+def _match_query(q: str) -> Optional[str]:
+    """Turn user input into an FTS5 query: words are prefix terms, "quoted" text is a phrase."""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', q):
+        if phrase:
+            words = re.findall(r"\w+", phrase)
+            if words:
+                terms.append('"' + " ".join(words) + '"')
+        else:
+            terms += [f'"{w}"*' for w in re.findall(r"\w+", word)]
+    return " AND ".join(terms) or None
+
+
+def _like(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _highlight(text: Optional[str]) -> str:
+    """HTML-escape text and mark matched terms with <mark>."""
+    if not text:
+        return ""
+    return html.escape(text).replace(_HL_OPEN, "<mark>").replace(_HL_CLOSE, "</mark>")
+
+
+def encode_search_cursor(sort: str, key, path: str) -> str:
+    """Opaque cursor for the row after which the next page starts."""
+    return base64.urlsafe_b64encode(json.dumps([sort, key, path]).encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple:
+    """Inverse of encode_search_cursor; raises ValueError if malformed."""
+    try:
+        sort, key, path = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return sort, key, path
+
+
+_index: Optional[VaultIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_vault_index() -> VaultIndex:
+    """Return the process-wide vault index, opening it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VaultIndex()
+    return _index
@@ -2,12 +2,18 @@
 WEBXES Tech — WebSocket manager for real-time vault events
 
 Watches Pending_Approval/, Needs_Action/, Approved/, Rejected/ for changes
-and broadcasts events to connected WebSocket clients.
+and broadcasts events to connected WebSocket clients (Done/ is watched
+too, only to keep the dashboard counters and search index current).
+Changes come from OS file notifications (watchfiles) with a polling
+fallback, and the watcher sleeps while no clients are connected.
 """
 
 import asyncio
 import json
 import logging
+import os
+import uuid
+from collections import deque
 from pathlib import Path
 from typing import Optional
 
@@ -15,7 +21,10 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from jose import JWTError, jwt
 
 from api.auth import JWT_SECRET, JWT_ALGORITHM
-from config import PENDING_APPROVAL, NEEDS_ACTION, APPROVED, REJECTED
+from api.utils.concurrency import run_io
+from api.utils.vault_counters import get_vault_counters
+from api.utils.vault_index import get_vault_index
+from config import PENDING_APPROVAL, NEEDS_ACTION, APPROVED, REJECTED, DONE
 
 logger = logging.getLogger("websocket_manager")
 router = APIRouter(tags=["websocket"])
@@ -24,32 +33,193 @@ router = APIRouter(tags=["websocket"])
 _watcher_task: Optional[asyncio.Task] = None
 
 
+# Outbound queue per client and what to do when a slow client fills it:
+#   drop_oldest — discard the oldest queued message
+#   coalesce    — keep only the newest queued message per (type, path),
+#                 then drop the oldest if still full
+#   disconnect  — close the slow client
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "256"))
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "drop_oldest")
+WS_SEND_TIMEOUT = float(os.getenv("WS_SEND_TIMEOUT", "10"))
+
+# Vault events are grouped into one "batch" frame per window, and the last
+# WS_HISTORY frames are kept so reconnecting clients can catch up by seq.
+WS_BATCH_WINDOW = float(os.getenv("WS_BATCH_WINDOW", "0.25"))
+WS_HISTORY = int(os.getenv("WS_HISTORY", "1000"))
+
+# Seconds the watcher keeps running after the last client disconnects
+WS_IDLE_GRACE = float(os.getenv("WS_IDLE_GRACE", "60"))
+
+
+class ClientConnection:
+    """One WebSocket client with a bounded outbound queue and its own sender task."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int = WS_QUEUE_SIZE,
+                 policy: str = WS_OVERFLOW_POLICY):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.policy = policy
+        self.pending: deque[tuple[Optional[str], str]] = deque()
+        self.dropped = 0
+        self._wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, message: str, key: Optional[str] = None) -> bool:
+        """Queue a pre-serialized message. Returns False if the client should be dropped."""
+        if len(self.pending) >= self.max_queue:
+            if self.policy == "disconnect":
+                return False
+            if self.policy == "coalesce" and key is not None:
+                self.pending = deque(item for item in self.pending if item[0] != key)
+            while len(self.pending) >= self.max_queue:
+                self.pending.popleft()
+                self.dropped += 1
+        self.pending.append((key, message))
+        self._wakeup.set()
+        return True
+
+    async def run(self, on_error):
+        """Drain the queue to the socket until cancelled or a send fails."""
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self.pending:
+                    _, message = self.pending.popleft()
+                    await asyncio.wait_for(self.websocket.send_text(message), WS_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket send failed ({type(e).__name__}), dropping client")
+            await on_error(self)
+
+
 class ConnectionManager:
-    """Manage WebSocket connections and broadcast events."""
+    """Manage WebSocket connections and fan events out to them.
 
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+    publish() buffers vault events and emits them as sequenced frames:
+        {"type": "batch", "epoch": str, "seq": int, "events": [...]}
+    Each frame is serialized once and only enqueued; every client's sender
+    task writes at its own pace under the overflow policy, so a slow client
+    never delays the others or the watch loop.
+    Clients reconnect with ?epoch=&since=<last seq> to receive only the
+    frames they missed, or a {"type": "resync"} frame if those are gone.
+    """
 
-    async def connect(self, websocket: WebSocket):
+    def __init__(self):
+        self.clients: dict[WebSocket, ClientConnection] = {}
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._history: deque[tuple[int, str]] = deque(maxlen=WS_HISTORY)
+        self._buffer: dict[str, dict] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._idle_timer: Optional[asyncio.Task] = None
+        # Set while at least one client is connected / while none are
+        self.has_clients = asyncio.Event()
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return list(self.clients)
+
+    def _update_presence(self):
+        if self.clients:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self.idle.clear()
+            self.has_clients.set()
+        else:
+            self.has_clients.clear()
+            if not self.idle.is_set() and self._idle_timer is None:
+                self._idle_timer = asyncio.create_task(self._go_idle())
+
+    async def _go_idle(self):
+        # Grace period so a client that briefly drops can still catch up
+        await asyncio.sleep(WS_IDLE_GRACE)
+        self._idle_timer = None
+        if not self.clients:
+            self.idle.set()
+
+    def reset_history(self):
+        """Start a new epoch; reconnecting clients will be told to resync."""
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._history.clear()
+
+    async def connect(self, websocket: WebSocket, epoch: str = "",
+                      since: Optional[int] = None) -> ClientConnection:
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total: {len(self.active_connections)}")
+        client = ClientConnection(websocket)
+        client.task = asyncio.create_task(client.run(self._drop))
+        self.clients[websocket] = client
+        self._update_presence()
+        logger.info(f"WebSocket connected. Total: {len(self.clients)}")
+
+        client.offer(json.dumps({"type": "hello", "epoch": self.epoch, "seq": self.seq}))
+        if since is not None:
+            self._replay(client, epoch, since)
+        return client
+
+    def _replay(self, client: ClientConnection, epoch: str, since: int):
+        """Send a reconnecting client the frames after since, or ask it to resync."""
+        if since == self.seq and epoch == self.epoch:
+            return
+        oldest = self._history[0][0] if self._history else self.seq + 1
+        if epoch != self.epoch or since > self.seq or since < oldest - 1:
+            client.offer(json.dumps({"type": "resync", "epoch": self.epoch, "seq": self.seq}))
+            return
+        for seq, message in self._history:
+            if seq > since:
+                client.offer(message)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
-
-    async def broadcast(self, event: dict):
-        """Send event to all connected clients."""
-        message = json.dumps(event)
-        disconnected = []
-        for conn in self.active_connections:
-            try:
-                await conn.send_text(message)
-            except Exception:
-                disconnected.append(conn)
-        for conn in disconnected:
-            self.active_connections.remove(conn)
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        if client.task and client.task is not asyncio.current_task():
+            client.task.cancel()
+        self._update_presence()
+        logger.info(f"WebSocket disconnected. Total: {len(self.clients)}")
+
+    async def _drop(self, client: ClientConnection):
+        self.disconnect(client.websocket)
+        try:
+            await client.websocket.close(code=1013, reason="Client too slow")
+        except Exception:
+            pass
+
+    def send(self, websocket: WebSocket, event: dict):
+        """Queue an event for a single client."""
+        client = self.clients.get(websocket)
+        if client and not client.offer(json.dumps(event)):
+            asyncio.create_task(self._drop(client))
+
+    def publish(self, event: dict):
+        """Buffer a vault event for the next batch frame.
+
+        Within one window, later events for the same type:path replace
+        earlier ones.
+        """
+        key = f"{event.get('type')}:{event.get('path', event.get('file'))}"
+        self._buffer.pop(key, None)
+        self._buffer[key] = event
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(WS_BATCH_WINDOW)
+        events, self._buffer = list(self._buffer.values()), {}
+        if not events:
+            return
+        self.seq += 1
+        frame = {"type": "batch", "epoch": self.epoch, "seq": self.seq, "events": events}
+        message = json.dumps(frame)
+        self._history.append((self.seq, message))
+        for client in list(self.clients.values()):
+            if not client.offer(message):
+                await self._drop(client)
 
 
 manager = ConnectionManager()
@@ -62,65 +232,133 @@ WATCH_DIRS = {
     str(REJECTED): "approval_rejected",
 }
 
+# Folders watched for the dashboard counters and search index only (no broadcast)
+COUNTED_DIRS = [str(DONE)]
+
+# Fallback polling interval when watchfiles is unavailable
+POLL_INTERVAL = 2.0
+
+try:
+    from watchfiles import Change, awatch
+except ImportError:  # pragma: no cover - watchfiles is in requirements.txt
+    awatch = None
+
+
+def _md_only(change, path: str) -> bool:
+    return path.endswith(".md")
+
+
+async def _watchfiles_changes(stop_event: asyncio.Event):
+    """Yield batches of (kind, path) from OS file notifications.
+
+    watchfiles groups a burst of changes into one batch (50 ms debounce).
+    """
+    kinds = {Change.added: "added", Change.modified: "modified", Change.deleted: "deleted"}
+    async for batch in awatch(
+        *WATCH_DIRS, *COUNTED_DIRS, watch_filter=_md_only, debounce=50, step=20, stop_event=stop_event,
+    ):
+        yield [(kinds[change], Path(path)) for change, path in batch]
+
+
+async def _polling_changes(stop_event: asyncio.Event):
+    """Yield batches of (kind, path) by diffing mtimes every POLL_INTERVAL."""
+    def scan() -> dict[str, float]:
+        files = {}
+        for dir_path in [*WATCH_DIRS, *COUNTED_DIRS]:
+            for f in Path(dir_path).rglob("*.md"):
+                try:
+                    files[str(f)] = f.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+        return files
+
+    known = await run_io(scan)
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=POLL_INTERVAL)
+            break
+        except asyncio.TimeoutError:
+            pass
+        current = await run_io(scan)
+        batch = [("added", Path(f)) for f in current if f not in known]
+        batch += [("modified", Path(f)) for f, m in current.items() if f in known and known[f] != m]
+        batch += [("deleted", Path(f)) for f in known if f not in current]
+        known = current
+        if batch:
+            yield batch
+
+
+def _coalesce(batch: list[tuple[str, Path]]) -> dict[Path, str]:
+    """Collapse a burst of changes to one net action per path.
+
+    created+modified → created, modified+deleted → removed, and a file
+    created and deleted within the same burst is dropped.
+    """
+    kinds: dict[Path, set[str]] = {}
+    for kind, path in batch:
+        kinds.setdefault(path, set()).add(kind)
+
+    actions = {}
+    for path, seen in kinds.items():
+        if path.exists():
+            actions[path] = "created" if "added" in seen else "modified"
+        elif "added" not in seen:
+            actions[path] = "removed"
+    return actions
+
+
+def _event_type(path: Path) -> Optional[tuple[str, Path]]:
+    """Return (event_type, watch_dir) for a path under a watched folder."""
+    for dir_path, event_type in WATCH_DIRS.items():
+        root = Path(dir_path)
+        if root in path.parents:
+            return event_type, root
+    return None
+
 
 async def watch_vault_folders():
-    """Watch vault folders for changes using polling (cross-platform)."""
-    # Track known files and their mtimes
-    known_files: dict[str, float] = {}
+    """Watch vault folders and broadcast changes while clients are connected.
 
-    # Initial scan
-    for dir_path in WATCH_DIRS:
-        p = Path(dir_path)
-        if p.exists():
-            for f in p.rglob("*.md"):
-                known_files[str(f)] = f.stat().st_mtime
+    Uses OS notifications via watchfiles (polling fallback) and pauses
+    completely when no WebSocket clients are connected.
+    """
+    index = get_vault_index()
+    counters = get_vault_counters()
+    for dir_path in [*WATCH_DIRS, *COUNTED_DIRS]:
+        Path(dir_path).mkdir(parents=True, exist_ok=True)
+    source = _watchfiles_changes if awatch is not None else _polling_changes
 
     while True:
-        await asyncio.sleep(2)  # Poll every 2 seconds
-
-        current_files: dict[str, float] = {}
-        for dir_path, event_type in WATCH_DIRS.items():
-            p = Path(dir_path)
-            if not p.exists():
-                continue
-
-            for f in p.rglob("*.md"):
-                fstr = str(f)
-                mtime = f.stat().st_mtime
-                current_files[fstr] = mtime
-
-                if fstr not in known_files:
-                    # New file
-                    await manager.broadcast({
-                        "type": event_type,
-                        "file": f.name,
-                        "path": str(f.relative_to(p.parent)),
-                        "action": "created",
-                    })
-                elif known_files[fstr] != mtime:
-                    # Modified file
-                    await manager.broadcast({
-                        "type": event_type,
-                        "file": f.name,
-                        "path": str(f.relative_to(p.parent)),
-                        "action": "modified",
-                    })
-
-        # Check for deleted files
-        for fstr in known_files:
-            if fstr not in current_files:
-                # Determine which watch dir it was in
-                for dir_path, event_type in WATCH_DIRS.items():
-                    if fstr.startswith(dir_path):
-                        fname = Path(fstr).name
-                        await manager.broadcast({
-                            "type": event_type,
-                            "file": fname,
-                            "action": "removed",
-                        })
-                        break
-
-        known_files = current_files
+        await manager.has_clients.wait()
+        logger.info(f"Vault watcher resumed ({source.__name__.strip('_')})")
+
+        # Changes made while paused were not seen — catch the index up
+        for dir_path in WATCH_DIRS:
+            await run_io(index.reconcile, Path(dir_path))
+        await run_io(counters.reconcile)
+        counters.live = True
+
+        async for batch in source(manager.idle):
+            # exists()/stat() can block on a synced vault; keep them off the loop
+            actions = await run_io(_coalesce, batch)
+            for path, action in actions.items():
+                await run_io(counters.apply_change, path)
+                await run_io(index.apply_change, path)
+                match = _event_type(path)
+                if match is None:
+                    continue
+                event_type, root = match
+                manager.publish({
+                    "type": event_type,
+                    "file": path.name,
+                    "path": str(path.relative_to(root.parent)).replace("\\", "/"),
+                    "action": action,
+                })
+
+        # Changes while paused won't be in the history, so start a new epoch
+        counters.live = False
+        manager.reset_history()
+        logger.info("Vault watcher paused (no clients)")
 
 
 async def start_watcher():
@@ -152,18 +390,29 @@ def _verify_ws_token(token: str) -> bool:
 
 
 @router.websocket("/api/ws")
-async def websocket_endpoint(websocket: WebSocket, token: str = Query("")):
-    """WebSocket endpoint for real-time vault events."""
+async def websocket_endpoint(
+    websocket: WebSocket,
+    token: str = Query(""),
+    epoch: str = Query(""),
+    since: Optional[int] = Query(None),
+):
+    """WebSocket endpoint for real-time vault events.
+
+    Reconnecting clients pass the epoch and last seq they saw to receive
+    only the missed batch frames.
+    """
     if not _verify_ws_token(token):
         await websocket.close(code=4001, reason="Invalid token")
         return
 
-    await manager.connect(websocket)
+    await manager.connect(websocket, epoch=epoch, since=since)
     try:
         while True:
             # Keep connection alive, handle pings
             data = await websocket.receive_text()
             if data == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
+                manager.send(websocket, {"type": "pong"})
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
@@ -27,6 +27,7 @@ from config import (
     ODOO_URL, ODOO_DB, ODOO_USER, ODOO_PASSWORD,
 )
 from audit_logger import audit_log
+from vault_document import read_document, split_frontmatter
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("approval_watcher")
@@ -39,23 +40,6 @@ DOMAIN_DIRS = {
 }
 
 
-# ── Frontmatter Parser ────────────────────────────────────────────────
-
-def parse_frontmatter(content: str) -> dict:
-    """Extract YAML frontmatter metadata from file content."""
-    if not content.startswith("---"):
-        return {}
-    parts = content.split("---", 2)
-    if len(parts) < 3:
-        return {}
-    metadata = {}
-    for line in parts[1].strip().split("\n"):
-        if ":" in line:
-            key, _, value = line.partition(":")
-            metadata[key.strip()] = value.strip()
-    return metadata
-
-
 # ── Email Execution ───────────────────────────────────────────────────
 
 def _send_email(creds, recipient: str, subject: str, body: str) -> bool:
@@ -135,7 +119,7 @@ def process_email(file_path: Path) -> bool:
 def process_social_media(file_path: Path) -> bool:
     """Process an approved social media post — detect platform and post."""
     content = file_path.read_text(encoding="utf-8")
-    metadata = parse_frontmatter(content)
+    metadata, _ = split_frontmatter(content)
     platform = metadata.get("platform", "").lower()
 
     # Extract post text (after second --- in content body)
@@ -205,8 +189,7 @@ def process_social_media(file_path: Path) -> bool:
 
 def process_payment(file_path: Path) -> bool:
     """Process an approved payment — create invoice in Odoo."""
-    content = file_path.read_text(encoding="utf-8")
-    metadata = parse_frontmatter(content)
+    metadata = read_document(file_path).metadata
 
     vendor = metadata.get("vendor", metadata.get("partner", ""))
     amount = metadata.get("amount", "0")
@@ -1,26 +1,24 @@
 """
 WEBXES Tech — Audit Logger
 
-JSON Lines audit trail at Logs/audit.jsonl.
+JSON Lines audit trail, partitioned into daily segments under Logs/audit/.
+Storage, compression and indexed queries live in audit_store.py.
 
 Usage:
-    from audit_logger import audit_log, query_events, get_summary
+    from audit_logger import audit_log, audit_log_many, query_events, query_page, recent_events, stream_events, get_summary
     audit_log("email", "send", {"to": "ceo@example.com"}, "success")
+    audit_log_many([{"category": "dashboard", "action": "approve"}, ...])
 """
 
-import json
 from datetime import datetime
-from pathlib import Path
 
-from config import LOGS
+from audit_store import (
+    RECENT_EVENTS, append_events, events_since, get_audit_store, tail_events,
+)
 
-AUDIT_FILE = LOGS / "audit.jsonl"
 
-
-def audit_log(category: str, action: str, details: dict = None,
-              status: str = "success", error: str = ""):
-    """Append a structured audit event to Logs/audit.jsonl."""
-    AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
+def _make_event(category: str, action: str, details: dict = None,
+                status: str = "success", error: str = "") -> dict:
     event = {
         "timestamp": datetime.now().isoformat(),
         "category": category,
@@ -30,24 +28,26 @@ def audit_log(category: str, action: str, details: dict = None,
     }
     if error:
         event["error"] = error
-    with open(AUDIT_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(event) + "\n")
-
-
-def _load_events() -> list[dict]:
-    """Read all events from the audit file."""
-    if not AUDIT_FILE.exists():
-        return []
-    events = []
-    with open(AUDIT_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                try:
-                    events.append(json.loads(line))
-                except json.JSONDecodeError:
-                    continue
-    return events
+    return event
+
+
+def audit_log(category: str, action: str, details: dict = None,
+              status: str = "success", error: str = ""):
+    """Append a structured audit event to today's audit segment."""
+    audit_log_many([{
+        "category": category, "action": action, "details": details,
+        "status": status, "error": error,
+    }])
+
+
+def audit_log_many(entries: list[dict]):
+    """Append several audit events in a single write.
+
+    Each entry takes the same keys as audit_log's arguments
+    (category, action, details, status, error).
+    """
+    if entries:
+        append_events([_make_event(**e) for e in entries])
 
 
 def query_events(category: str = None, start_date: str = None,
@@ -58,23 +58,60 @@ def query_events(category: str = None, start_date: str = None,
         category: Filter by event category (e.g., "email", "social_media").
         start_date: ISO date string — include events on or after this date.
         end_date: ISO date string — include events on or before this date.
+
+    Returns events in chronological order. Use query_page for paginated,
+    newest-first access.
+    """
+    result = get_audit_store().query(
+        category=category, start_date=start_date, end_date=end_date,
+        limit=None, with_total=False,
+    )
+    return result["events"][::-1]
+
+
+def query_page(category: str = None, status: str = None, start_date: str = None,
+               end_date: str = None, search: str = None, cursor: str = None,
+               limit: int = 50, offset: int = 0) -> dict:
+    """Newest-first page of audit events from the indexed store.
+
+    Returns:
+        {"events": [...], "total": int | None, "next_cursor": str | None}
+        total is only computed for offset paging (cursor=None).
+    """
+    return get_audit_store().query(
+        category=category, status=status, start_date=start_date,
+        end_date=end_date, search=search, cursor=cursor, limit=limit,
+        offset=offset, with_total=cursor is None,
+    )
+
+
+def recent_events(n: int = 20) -> list[dict]:
+    """Return the last n events, chronological.
+
+    Served from the store's in-memory buffer; larger n falls back to
+    reading segments backwards from EOF.
+    """
+    if n <= RECENT_EVENTS:
+        return get_audit_store().recent(n)
+    return tail_events(n)[::-1]
+
+
+def recent_version() -> str:
+    """Cheap validator for recent_events(); changes when a newer event lands."""
+    return get_audit_store().recent_version()
+
+
+def stream_events(position: str = None) -> tuple[list[dict], str]:
+    """Return (events appended since position, new position).
+
+    Call with None first to get the current end of the log, then keep
+    passing the returned position to receive only new events.
     """
-    events = _load_events()
-    filtered = []
-    for ev in events:
-        if category and ev.get("category") != category:
-            continue
-        ts = ev.get("timestamp", "")
-        if start_date and ts < start_date:
-            continue
-        if end_date and ts > end_date + "T23:59:59":
-            continue
-        filtered.append(ev)
-    return filtered
+    return events_since(position)
 
 
 def get_summary(start_date: str = None, end_date: str = None) -> dict:
-    """Return counts grouped by category and status.
+    """Return counts grouped by category and status, from rollup buckets.
 
     Returns:
         {
@@ -84,18 +121,15 @@ def get_summary(start_date: str = None, end_date: str = None) -> dict:
             "by_category_status": {"email:success": 4, "email:error": 1, ...}
         }
     """
-    events = query_events(start_date=start_date, end_date=end_date)
     summary = {
-        "total": len(events),
+        "total": 0,
         "by_category": {},
         "by_status": {},
         "by_category_status": {},
     }
-    for ev in events:
-        cat = ev.get("category", "unknown")
-        st = ev.get("status", "unknown")
-        summary["by_category"][cat] = summary["by_category"].get(cat, 0) + 1
-        summary["by_status"][st] = summary["by_status"].get(st, 0) + 1
-        key = f"{cat}:{st}"
-        summary["by_category_status"][key] = summary["by_category_status"].get(key, 0) + 1
+    for cat, st, n in get_audit_store().summary(start_date=start_date, end_date=end_date):
+        summary["total"] += n
+        summary["by_category"][cat] = summary["by_category"].get(cat, 0) + n
+        summary["by_status"][st] = summary["by_status"].get(st, 0) + n
+        summary["by_category_status"][f"{cat}:{st}"] = n
     return summary
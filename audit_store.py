@@ -0,0 +1,537 @@
+"""
+WEBXES Tech — Audit storage engine
+
+Events are written to daily JSON Lines segments, Logs/audit/YYYY-MM-DD.jsonl.
+Segments older than COMPRESS_AFTER_DAYS are gzipped in place to
+YYYY-MM-DD.jsonl.gz. The pre-partitioning Logs/audit.jsonl is still read
+as a legacy segment with no known date range.
+
+The segments are indexed into SQLite (Logs/audit_index.db) so queries cost
+O(page size) instead of O(log size).
+
+  - events table: time-ordered index on timestamp plus secondary
+    (category, timestamp) and (status, timestamp) indexes.
+  - events_fts: trigram full-text index over action + details, giving the
+    same case-insensitive substring semantics as the old Python filter.
+  - rollup_hour / rollup_day: event counts per (bucket, category, status),
+    bumped as events are ingested, so summaries merge a handful of buckets.
+  - an in-memory buffer of the newest RECENT_EVENTS events for the
+    dashboard timeline.
+  - sources table: uncompressed byte offset ingested per segment, so each
+    sync only reads lines appended since the last one. Compressed segments
+    are immutable and marked sealed once fully ingested.
+
+Segments stay the source of truth — every process appends to them via
+audit_logger, and the index catches up on read. Date-bounded queries only
+open segments whose day falls inside the range.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Optional
+
+from config import LOGS
+
+logger = logging.getLogger("audit_store")
+
+AUDIT_DIR = LOGS / "audit"
+AUDIT_FILE = LOGS / "audit.jsonl"  # legacy single-file log
+INDEX_FILE = LOGS / "audit_index.db"
+COMPRESS_AFTER_DAYS = int(os.getenv("AUDIT_COMPRESS_AFTER_DAYS", "7"))
+
+_SEGMENT_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.jsonl(\.gz)?$")
+_SEALED = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    source    TEXT NOT NULL,
+    ts        TEXT NOT NULL,
+    category  TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    raw       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+CREATE INDEX IF NOT EXISTS idx_events_category_ts ON events(category, ts);
+CREATE INDEX IF NOT EXISTS idx_events_status_ts ON events(status, ts);
+CREATE INDEX IF NOT EXISTS idx_events_source ON events(source);
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(text, tokenize='trigram');
+CREATE TABLE IF NOT EXISTS sources (
+    name    TEXT PRIMARY KEY,
+    offset  INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollup_hour (
+    bucket    TEXT NOT NULL,
+    category  TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    count     INTEGER NOT NULL,
+    PRIMARY KEY (bucket, category, status)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_day (
+    bucket    TEXT NOT NULL,
+    category  TEXT NOT NULL,
+    status    TEXT NOT NULL,
+    count     INTEGER NOT NULL,
+    PRIMARY KEY (bucket, category, status)
+) WITHOUT ROWID;
+"""
+
+# rollup table → length of the timestamp prefix used as its bucket key
+_ROLLUPS = {"rollup_hour": 13, "rollup_day": 10}
+RECENT_EVENTS = 200
+
+
+def _end_bound(end_date: str) -> str:
+    """Upper timestamp bound for an inclusive ISO end date."""
+    return end_date + "T23:59:59.999999" if "T" not in end_date else end_date
+
+
+# ── Segments ──────────────────────────────────────────────────────────
+
+def segment_path(day: str) -> Path:
+    """Path of the uncompressed segment for an ISO day (YYYY-MM-DD)."""
+    return AUDIT_DIR / f"{day}.jsonl"
+
+
+def list_segments() -> list[tuple[str, Path]]:
+    """Return (day, path) for every segment, oldest first.
+
+    If both forms of a day exist (mid-compression), the .jsonl wins.
+    """
+    found: dict[str, Path] = {}
+    if AUDIT_DIR.exists():
+        for entry in os.scandir(AUDIT_DIR):
+            m = _SEGMENT_RE.match(entry.name)
+            if m and (m.group(1) not in found or not m.group(2)):
+                found[m.group(1)] = Path(entry.path)
+    return sorted(found.items())
+
+
+def append_events(events: list[dict]):
+    """Append events to their daily segments, one write per segment."""
+    by_day: dict[str, list[str]] = {}
+    for ev in events:
+        by_day.setdefault(ev["timestamp"][:10], []).append(json.dumps(ev) + "\n")
+
+    AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+    new_segment = False
+    for day, lines in by_day.items():
+        path = segment_path(day)
+        new_segment = new_segment or not path.exists()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    # First write of a new day — a good moment to compress old segments
+    if new_segment:
+        try:
+            compress_old_segments()
+        except OSError as e:
+            logger.warning(f"Segment compression failed: {e}")
+
+
+def compress_old_segments(keep_days: int = COMPRESS_AFTER_DAYS):
+    """Gzip plain segments older than keep_days. Safe to run concurrently."""
+    cutoff = (date.today() - timedelta(days=keep_days)).isoformat()
+    for day, path in list_segments():
+        if day >= cutoff or path.suffix == ".gz":
+            continue
+        gz_path = path.with_name(path.name + ".gz")
+        tmp_path = path.with_name(f"{path.name}.gz.{os.getpid()}.tmp")
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, gz_path)
+        path.unlink(missing_ok=True)
+        logger.info(f"Compressed audit segment {gz_path.name}")
+
+
+# ── Tail / streaming reads ────────────────────────────────────────────
+
+TAIL_BLOCK = 64 * 1024
+
+
+def _lines_backwards(path: Path, block: int = TAIL_BLOCK):
+    """Yield raw lines of a segment newest-first, reading blocks from EOF."""
+    if path.suffix == ".gz":
+        # gzip can't seek backwards cheaply; old segments are small and rare here
+        with gzip.open(path, "rb") as f:
+            yield from reversed(f.read().splitlines())
+        return
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            step = min(block, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b"\n")
+            tail = lines[0]
+            yield from reversed(lines[1:])
+        if tail:
+            yield tail
+
+
+def iter_events_reverse():
+    """Yield decoded audit events newest-first across all segments.
+
+    Reads lazily — stop iterating and no further blocks are read.
+    """
+    paths = [path for _, path in reversed(list_segments())]
+    if AUDIT_FILE.exists():
+        paths.append(AUDIT_FILE)
+    for path in paths:
+        try:
+            for line in _lines_backwards(path):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    ev = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # includes a partially-written last line
+                if isinstance(ev, dict):
+                    yield ev
+        except FileNotFoundError:
+            continue
+
+
+def tail_events(n: int = 20) -> list[dict]:
+    """Return the newest n events, newest first, without scanning from the start."""
+    return list(islice(iter_events_reverse(), n))
+
+
+def events_since(position: Optional[str] = None) -> tuple[list[dict], str]:
+    """Return events appended after position, plus the new position.
+
+    Positions are opaque "<segment day>:<byte offset>" strings. Pass None
+    to get the current end of the log (no events) and start streaming
+    from there.
+    """
+    segments = [(day, path) for day, path in list_segments() if path.suffix != ".gz"]
+    if not segments:
+        return [], position or ""
+    if not position:
+        day, path = segments[-1]
+        return [], f"{day}:{path.stat().st_size}"
+
+    since_day, _, since_offset = position.partition(":")
+    offset = int(since_offset or 0)
+    events: list[dict] = []
+    new_position = position
+    for day, path in segments:
+        if day < since_day:
+            continue
+        start = offset if day == since_day else 0
+        with open(path, "rb") as f:
+            f.seek(start)
+            chunk = f.read()
+        # Only consume complete lines; a writer may be mid-append
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            try:
+                ev = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(ev, dict):
+                events.append(ev)
+        new_position = f"{day}:{start + end}"
+    return events, new_position
+
+
+def _in_range(day: str, start_date: str = None, end_date: str = None) -> bool:
+    return (not start_date or day >= start_date[:10]) and (not end_date or day <= end_date[:10])
+
+
+def encode_cursor(ts: str, event_id: int) -> str:
+    return f"{ts}|{event_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    ts, _, event_id = cursor.rpartition("|")
+    return ts, int(event_id)
+
+
+class AuditStore:
+    """SQLite index over JSON Lines audit files."""
+
+    def __init__(self, db_path: Path = INDEX_FILE):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        if self._conn.execute("SELECT 1 FROM rollup_day LIMIT 1").fetchone() is None:
+            self._rebuild_rollups()
+        self._conn.commit()
+
+        # Newest-first (ts, id, event) tuples
+        self._recent: list[tuple[str, int, dict]] = []
+        self._seed_recent()
+
+    # ── Rollups ───────────────────────────────────────────────────────
+
+    def _rebuild_rollups(self):
+        for table, width in _ROLLUPS.items():
+            self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute(
+                f"INSERT INTO {table} (bucket, category, status, count) "
+                f"SELECT substr(ts, 1, {width}), category, status, COUNT(*) "
+                "FROM events GROUP BY 1, 2, 3"
+            )
+
+    def _bump_rollups(self, counts: Counter, sign: int = 1):
+        """Add (or with sign=-1, subtract) per-hour (ts, category, status) counts."""
+        for table, width in _ROLLUPS.items():
+            merged: Counter = Counter()
+            for (hour, cat, st), n in counts.items():
+                merged[(hour[:width], cat, st)] += n
+            self._conn.executemany(
+                f"INSERT INTO {table} (bucket, category, status, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (bucket, category, status) DO UPDATE SET count = count + excluded.count",
+                [(b, c, st, sign * n) for (b, c, st), n in merged.items()],
+            )
+
+    def _seed_recent(self):
+        self._recent = [
+            (ts, event_id, json.loads(raw))
+            for event_id, ts, raw in self._conn.execute(
+                "SELECT id, ts, raw FROM events ORDER BY ts DESC, id DESC LIMIT ?",
+                (RECENT_EVENTS,),
+            )
+        ]
+
+    def _remember(self, ts: str, event_id: int, event: dict):
+        """Insert into the newest-first recent buffer, keeping it bounded."""
+        if len(self._recent) >= RECENT_EVENTS and (ts, event_id) < self._recent[-1][:2]:
+            return
+        key = (ts, event_id)
+        i = 0
+        while i < len(self._recent) and self._recent[i][:2] > key:
+            i += 1
+        self._recent.insert(i, (ts, event_id, event))
+        del self._recent[RECENT_EVENTS:]
+
+    # ── Ingestion ─────────────────────────────────────────────────────
+
+    def _forget_source(self, name: str):
+        counts = Counter({
+            (hour, cat, st): n
+            for hour, cat, st, n in self._conn.execute(
+                "SELECT substr(ts, 1, 13), category, status, COUNT(*) FROM events "
+                "WHERE source = ? GROUP BY 1, 2, 3", (name,)
+            )
+        })
+        self._bump_rollups(counts, sign=-1)
+        ids = [(r[0],) for r in self._conn.execute("SELECT id FROM events WHERE source = ?", (name,))]
+        self._conn.executemany("DELETE FROM events_fts WHERE rowid = ?", ids)
+        self._conn.execute("DELETE FROM events WHERE source = ?", (name,))
+        self._conn.execute("DELETE FROM sources WHERE name = ?", (name,))
+        self._seed_recent()
+
+    def _insert_lines(self, name: str, data: bytes):
+        counts: Counter = Counter()
+        for line in data.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                ev = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(ev, dict):
+                continue
+            ts = ev.get("timestamp", "")
+            category = ev.get("category", "unknown")
+            status = ev.get("status", "unknown")
+            cur = self._conn.execute(
+                "INSERT INTO events (source, ts, category, status, raw) VALUES (?, ?, ?, ?, ?)",
+                (name, ts, category, status, line.decode("utf-8", errors="replace")),
+            )
+            self._conn.execute(
+                "INSERT INTO events_fts (rowid, text) VALUES (?, ?)",
+                (cur.lastrowid, f"{ev.get('action', '')}\n{ev.get('details', '')}"),
+            )
+            counts[(ts[:13], category, status)] += 1
+            self._remember(ts, cur.lastrowid, ev)
+        self._bump_rollups(counts)
+
+    def _set_offset(self, name: str, offset: int):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sources (name, offset) VALUES (?, ?)", (name, offset)
+        )
+
+    def _ingest_plain(self, name: str, path: Path, offset: int):
+        size = path.stat().st_size
+        if size < offset:
+            # File was truncated or replaced — rebuild it from scratch
+            logger.warning(f"{path.name} shrank ({size} < {offset}), re-indexing")
+            self._forget_source(name)
+            offset = 0
+        if size == offset:
+            return
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+        # Only consume complete lines; a writer may be mid-append
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+        self._insert_lines(name, chunk[:end])
+        self._set_offset(name, offset + end)
+
+    def _ingest_sealed(self, name: str, path: Path, offset: int):
+        # Compressed segments are immutable: read past what was already
+        # ingested from the plain file, then never open this segment again.
+        with gzip.open(path, "rb") as f:
+            f.seek(offset)
+            self._insert_lines(name, f.read())
+        self._set_offset(name, _SEALED)
+
+    def sync(self, start_date: str = None, end_date: str = None):
+        """Ingest events appended since the last sync.
+
+        Only segments whose day falls in [start_date, end_date] are opened.
+        """
+        with self._lock:
+            offsets = dict(self._conn.execute("SELECT name, offset FROM sources"))
+            if AUDIT_FILE.exists():
+                self._ingest_plain(AUDIT_FILE.name, AUDIT_FILE, offsets.get(AUDIT_FILE.name, 0))
+            for day, path in list_segments():
+                offset = offsets.get(day, 0)
+                if offset == _SEALED or not _in_range(day, start_date, end_date):
+                    continue
+                try:
+                    if path.suffix == ".gz":
+                        self._ingest_sealed(day, path, offset)
+                    else:
+                        self._ingest_plain(day, path, offset)
+                except FileNotFoundError:
+                    # Compressed between listing and reading; next sync picks up the .gz
+                    continue
+            self._conn.commit()
+
+    # ── Queries ───────────────────────────────────────────────────────
+
+    def _where(self, category: str = None, status: str = None,
+               start_date: str = None, end_date: str = None,
+               search: str = None) -> tuple[str, list]:
+        where, params = [], []
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if start_date:
+            where.append("ts >= ?")
+            params.append(start_date)
+        if end_date:
+            where.append("ts <= ?")
+            params.append(_end_bound(end_date))
+        if search:
+            if len(search) >= 3:
+                # Trigram index: case-insensitive substring match
+                where.append("id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+                params.append('"' + search.replace('"', '""') + '"')
+            else:
+                where.append("id IN (SELECT rowid FROM events_fts WHERE text LIKE ?)")
+                params.append(f"%{search}%")
+        return (" WHERE " + " AND ".join(where)) if where else "", params
+
+    def query(self, category: str = None, status: str = None,
+              start_date: str = None, end_date: str = None, search: str = None,
+              cursor: str = None, limit: Optional[int] = 50, offset: int = 0,
+              with_total: bool = True) -> dict:
+        """Return newest-first events matching the filters.
+
+        Pass the returned next_cursor back as cursor to fetch the next page
+        without OFFSET scanning.
+
+        Returns:
+            {"events": [...], "total": int | None, "next_cursor": str | None}
+        """
+        self.sync(start_date, end_date)
+        clause, params = self._where(category, status, start_date, end_date, search)
+
+        page_clause, page_params = clause, list(params)
+        if cursor:
+            ts, event_id = decode_cursor(cursor)
+            page_clause += (" AND " if clause else " WHERE ") + "(ts < ? OR (ts = ? AND id < ?))"
+            page_params += [ts, ts, event_id]
+            offset = 0
+
+        with self._lock:
+            total = None
+            if with_total:
+                total = self._conn.execute(f"SELECT COUNT(*) FROM events{clause}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT id, ts, raw FROM events{page_clause} ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?",
+                page_params + [limit if limit is not None else -1, offset],
+            ).fetchall()
+
+        events = [json.loads(raw) for _, _, raw in rows]
+        next_cursor = None
+        if limit is not None and len(rows) == limit:
+            next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+        return {"events": events, "total": total, "next_cursor": next_cursor}
+
+    def summary(self, start_date: str = None, end_date: str = None) -> list[tuple[str, str, int]]:
+        """Return (category, status, count) rows for the date range.
+
+        Merges day buckets for plain ISO dates and hour buckets when either
+        bound carries a time (hour granularity).
+        """
+        self.sync(start_date, end_date)
+        hourly = any(b and "T" in b for b in (start_date, end_date))
+        table, width = ("rollup_hour", 13) if hourly else ("rollup_day", 10)
+        where, params = [], []
+        if start_date:
+            where.append("bucket >= ?")
+            params.append(start_date[:width])
+        if end_date:
+            where.append("bucket <= ?")
+            params.append(end_date[:width])
+        clause = (" WHERE " + " AND ".join(where)) if where else ""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT category, status, SUM(count) FROM {table}{clause} "
+                "GROUP BY category, status HAVING SUM(count) > 0",
+                params,
+            ).fetchall()
+
+    def recent_version(self) -> str:
+        """Identity of the newest event; changes whenever recent() would."""
+        self.sync()
+        with self._lock:
+            return "|".join(map(str, self._recent[0][:2])) if self._recent else ""
+
+    def recent(self, n: int = 20) -> list[dict]:
+        """Return the newest n events (n <= RECENT_EVENTS), oldest first."""
+        self.sync()
+        with self._lock:
+            return [ev for _, _, ev in self._recent[:n]][::-1]
+
+
+_store: Optional[AuditStore] = None
+_store_lock = threading.Lock()
+
+
+def get_audit_store() -> AuditStore:
+    """Return the process-wide audit store, opening it on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AuditStore()
+    return _store
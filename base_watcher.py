@@ -1,15 +1,72 @@
 # base_watcher.py - Template for all watchers
+#
+# The run loop waits between cycles on a wake-up event instead of a fixed
+# sleep. Push sources (e.g. a watchdog handler) call wake() when they queue
+# work, so it is handled at once; pull sources (e.g. Gmail) poll on an
+# adaptive interval that drops to min_interval while items are flowing and
+# doubles towards max_interval while idle. stop() ends the loop promptly.
+import threading
 import time
 import logging
 from pathlib import Path
 from abc import ABC, abstractmethod
 
+# Idle cycles multiply the interval by this, up to max_interval
+BACKOFF_FACTOR = 2
+
+# Longest single blocking wait, so Ctrl+C is noticed promptly on Windows
+WAIT_SLICE = 1.0
+
+
+class WatcherMetrics:
+    '''Counters for one watcher's run loop.'''
+
+    def __init__(self):
+        self.cycles = 0
+        self.items_processed = 0
+        self.errors = 0
+        self.last_cycle_seconds = 0.0
+        self.max_cycle_seconds = 0.0
+        self.total_cycle_seconds = 0.0
+        self.interval = 0.0
+        self.last_item_at = None
+
+    def record_cycle(self, items: int, seconds: float, error: bool = False):
+        self.cycles += 1
+        self.items_processed += items
+        self.errors += error
+        self.last_cycle_seconds = seconds
+        self.max_cycle_seconds = max(self.max_cycle_seconds, seconds)
+        self.total_cycle_seconds += seconds
+        if items:
+            self.last_item_at = time.time()
+
+    def as_dict(self) -> dict:
+        return {
+            'cycles': self.cycles,
+            'items_processed': self.items_processed,
+            'errors': self.errors,
+            'last_cycle_ms': round(self.last_cycle_seconds * 1000, 1),
+            'avg_cycle_ms': round(self.total_cycle_seconds / self.cycles * 1000, 1) if self.cycles else 0.0,
+            'max_cycle_ms': round(self.max_cycle_seconds * 1000, 1),
+            'interval_s': self.interval,
+            'last_item_at': self.last_item_at,
+        }
+
+
 class BaseWatcher(ABC):
-    def __init__(self, vault_path: str, check_interval: int = 60):
+    def __init__(self, vault_path: str, check_interval: int = 60,
+                 min_interval: float = None, max_interval: float = None):
         self.vault_path = Path(vault_path)
         self.needs_action = self.vault_path / 'Needs_Action'
         self.check_interval = check_interval
+        # Without explicit bounds the loop polls at a fixed check_interval
+        self.min_interval = min_interval if min_interval is not None else check_interval
+        self.max_interval = max_interval if max_interval is not None else check_interval
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.metrics = WatcherMetrics()
+        self.stop_event = threading.Event()
+        self._wake_event = threading.Event()
 
     @abstractmethod
     def check_for_updates(self) -> list:
@@ -21,13 +78,59 @@ class BaseWatcher(ABC):
         '''Create .md file in Needs_Action folder'''
         pass
 
+    def busy(self) -> bool:
+        '''True while the watcher has in-flight work to re-check soon.'''
+        return False
+
+    def wake(self):
+        '''Start the next cycle now (safe to call from any thread).'''
+        self._wake_event.set()
+
+    def stop(self):
+        '''Ask the run loop to exit after the current cycle.'''
+        self.stop_event.set()
+        self._wake_event.set()
+
+    def next_interval(self, interval: float, items: int) -> float:
+        '''Seconds to wait before the next cycle, given the last one.'''
+        if items or self.busy():
+            return self.min_interval
+        return min(max(interval, self.min_interval) * BACKOFF_FACTOR, self.max_interval)
+
+    def _wait(self, interval: float):
+        deadline = time.monotonic() + interval
+        while not self._wake_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._wake_event.wait(min(remaining, WAIT_SLICE))
+        self._wake_event.clear()
+
+    def run_cycle(self) -> int:
+        '''Check once and create action files; returns items processed.'''
+        items = self.check_for_updates()
+        for item in items:
+            self.create_action_file(item)
+        return len(items)
+
     def run(self):
-        self.logger.info(f'Starting {self.__class__.__name__}')
-        while True:
+        self.logger.info(
+            f'Starting {self.__class__.__name__} '
+            f'(interval {self.min_interval}-{self.max_interval}s)'
+        )
+        interval = self.min_interval
+        while not self.stop_event.is_set():
+            start = time.monotonic()
+            items, error = 0, False
             try:
-                items = self.check_for_updates()
-                for item in items:
-                    self.create_action_file(item)
+                items = self.run_cycle()
             except Exception as e:
+                error = True
                 self.logger.error(f'Error: {e}')
-            time.sleep(self.check_interval)
+            self.metrics.record_cycle(items, time.monotonic() - start, error)
+            interval = self.next_interval(interval, items)
+            self.metrics.interval = interval
+            if items:
+                self.logger.debug(f'Cycle processed {items} item(s); metrics: {self.metrics.as_dict()}')
+            self._wait(interval)
+        self.logger.info(f'Stopped {self.__class__.__name__}; metrics: {self.metrics.as_dict()}')
@@ -13,7 +13,6 @@ Usage:
 import argparse
 import logging
 import os
-import re
 import subprocess
 import time
 from datetime import datetime
@@ -24,6 +23,8 @@ from config import (
     DONE, IS_CLOUD, IS_LOCAL, WORK_ZONE, ensure_dirs,
 )
 from audit_logger import audit_log
+from sender_classifier import is_automated_sender
+from vault_document import read_document
 
 # Logging
 LOGS = VAULT_PATH / "Logs"
@@ -40,41 +41,6 @@ log = logging.getLogger("cloud_agent")
 
 POLL_INTERVAL = 60  # seconds
 
-# ── Automated sender filter (second line of defence after gmail_watcher) ──────
-
-AUTOMATED_DOMAINS = {
-    'linkedin.com', 'coursera.org', 'udemy.com', 'udemy-email.com',
-    'medium.com', 'producthunt.com', 'happyscribe.co',
-    'mailchimp.com', 'sendgrid.net', 'sendgrid.com',
-    'amazonses.com', 'canva.com', 'figma.com', 'notion.so',
-    'twitter.com', 'facebook.com', 'instagram.com', 'youtube.com',
-    'hubspot.com', 'mailgun.org', 'klaviyo.com',
-}
-
-AUTOMATED_KEYWORDS = [
-    'noreply', 'no-reply', 'donotreply', 'do-not-reply',
-    'notifications@', 'notification@', 'alerts@', 'alert@',
-    'newsletter@', 'digest@', 'mailer@', 'mailer-daemon',
-    'jobs-listings@', 'jobs@linkedin', 'info@linkedin',
-    'updates@', 'support@coursera', 'team@producthunt',
-]
-
-
-def is_automated_sender(sender: str) -> bool:
-    """Return True if the sender is automated/marketing — no reply needed."""
-    sender_lower = sender.lower()
-    for kw in AUTOMATED_KEYWORDS:
-        if kw in sender_lower:
-            return True
-    m = re.search(r'@([\w\-.]+)', sender_lower)
-    if m:
-        domain = m.group(1)
-        for blocked in AUTOMATED_DOMAINS:
-            if domain == blocked or domain.endswith('.' + blocked):
-                return True
-    return False
-
-
 # ── Draft generation ──────────────────────────────────────────────────────────
 
 def _structured_skeleton(sender: str, subject: str, email_body: str) -> str:
@@ -142,22 +108,6 @@ def generate_draft_body(sender: str, subject: str, email_body: str) -> str:
 
 # ── Core pipeline ─────────────────────────────────────────────────────────────
 
-def parse_frontmatter(filepath: Path) -> dict:
-    """Extract YAML frontmatter from a markdown file."""
-    text = filepath.read_text(encoding="utf-8")
-    if not text.startswith("---"):
-        return {}
-    parts = text.split("---", 2)
-    if len(parts) < 3:
-        return {}
-    meta = {}
-    for line in parts[1].strip().split("\n"):
-        if ":" in line:
-            key, _, val = line.partition(":")
-            meta[key.strip()] = val.strip()
-    return meta
-
-
 def claim_file(filepath: Path) -> Path:
     """Move a file to In_Progress/cloud/ to claim it (prevents double-work)."""
     dest = IN_PROGRESS_CLOUD / filepath.name
@@ -256,8 +206,8 @@ def process_emails():
 
     for filepath in email_files:
         try:
-            meta = parse_frontmatter(filepath)
-            content = filepath.read_text(encoding="utf-8")
+            doc = read_document(filepath)
+            meta = doc.metadata
             sender = meta.get("from", "")
 
             # ── Second-line filter: skip automated senders ─────────────────
@@ -271,11 +221,14 @@ def process_emails():
                 })
                 continue
 
+            # Body is only needed for drafting — read it before the claim moves the file
+            body = doc.body
+
             # Claim the file
             claimed = claim_file(filepath)
 
             # Create AI-generated draft
-            draft_path = create_draft(meta, content, filepath.name)
+            draft_path = create_draft(meta, body, filepath.name)
 
             # Signal local
             create_signal("new_draft", {
@@ -0,0 +1,115 @@
+"""
+WEBXES Tech — Inbox drop ledger
+
+Remembers the content hash of every file dropped into Inbox/ and the
+Needs_Action task created for it, in SQLite at Logs/inbox_drops.db, so a
+second copy of the same file (a re-drop, or a sync re-delivering it) is
+linked to the original task instead of creating another one.
+
+Hashes are SHA-256 over the file contents, read in fixed-size chunks so
+multi-GB drops hash in bounded memory. A hash only counts as a duplicate
+for DEDUP_DAYS after it was first seen.
+"""
+
+import hashlib
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import LOGS
+
+LEDGER_FILE = LOGS / "inbox_drops.db"
+DEDUP_DAYS = float(os.getenv("INBOX_DEDUP_DAYS", "30"))
+HASH_CHUNK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drops (
+    sha256      TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mime_type   TEXT NOT NULL,
+    filename    TEXT NOT NULL,
+    task        TEXT NOT NULL,
+    first_seen  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS duplicates (
+    sha256      TEXT NOT NULL,
+    filename    TEXT NOT NULL,
+    seen        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_duplicates_sha ON duplicates(sha256);
+"""
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 hex digest of a file, read HASH_CHUNK bytes at a time."""
+    digest = hashlib.sha256()
+    buf = bytearray(HASH_CHUNK)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            digest.update(view[:n])
+    return digest.hexdigest()
+
+
+def guess_mime(path: Path) -> str:
+    """MIME type from the file extension, application/octet-stream if unknown."""
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+class DropLedger:
+    """SQLite record of ingested Inbox drops by content hash."""
+
+    def __init__(self, db_path: Path = LEDGER_FILE):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def find(self, sha256: str) -> Optional[dict]:
+        """Return the original drop for a hash, if seen within DEDUP_DAYS."""
+        since = time.time() - DEDUP_DAYS * 86400
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256, size, mime_type, filename, task, first_seen FROM drops "
+                "WHERE sha256 = ? AND first_seen >= ?",
+                (sha256, since),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("sha256", "size", "mime_type", "filename", "task", "first_seen")
+        return dict(zip(keys, row))
+
+    def record(self, sha256: str, size: int, mime_type: str, filename: str, task: str):
+        """Record a new drop and the task created for it."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO drops (sha256, size, mime_type, filename, task, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (sha256, size, mime_type, filename, task, time.time()),
+            )
+            self._conn.commit()
+
+    def relink(self, sha256: str, task: str):
+        """Point a known drop at a replacement task (the original is gone)."""
+        with self._lock:
+            self._conn.execute("UPDATE drops SET task = ? WHERE sha256 = ?", (task, sha256))
+            self._conn.commit()
+
+    def record_duplicate(self, sha256: str, filename: str) -> int:
+        """Record another copy of a known drop; returns copies seen so far."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO duplicates (sha256, filename, seen) VALUES (?, ?, ?)",
+                (sha256, filename, time.time()),
+            )
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM duplicates WHERE sha256 = ?", (sha256,)
+            ).fetchone()[0]
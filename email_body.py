@@ -0,0 +1,214 @@
+"""
+WEBXES Tech — Email body extraction
+
+Turns a Gmail API message (format='full') into at most MAX_BODY_CHARS of
+readable text for the EMAIL_*.md action file.
+
+The MIME tree is walked lazily, depth first in document order. text/plain
+parts are preferred (all of them, concatenated, as before); HTML parts are
+only touched when the message has no plain text at all. Attachments —
+parts with a filename — are never read.
+
+Each part is decoded CHUNK_CHARS of base64 at a time through an
+incremental decoder for its charset, and decoding stops as soon as the
+budget is met. HTML chunks are fed to HTMLTextExtractor, an html.parser
+tokenizer that carries tags and entities split across chunks, drops
+head/script/style/title content and comments, and marks block elements
+as line breaks; whitespace is collapsed on the extracted text only.
+"""
+
+import base64
+import binascii
+import codecs
+import itertools
+import re
+from html.parser import HTMLParser
+from typing import Iterator, NamedTuple
+
+MAX_BODY_CHARS = 3000
+# Base64 characters decoded per step (6 KB); a multiple of 4 so chunks decode alone
+CHUNK_CHARS = 8 * 1024
+
+# Elements whose content is never shown to a reader
+_HIDDEN_TAGS = frozenset({'head', 'script', 'style', 'title', 'template', 'noscript'})
+# Tags that break the text flow; anything else (<b>, <a>, <span>) runs on
+_BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'ol',
+    'p', 'pre', 'section', 'table', 'td', 'th', 'tr', 'ul',
+})
+# Placeholder for a block boundary until whitespace is collapsed
+_BREAK = '\x00'
+_CHARSET_RE = re.compile(r'charset\s*=\s*"?([\w.:-]+)', re.IGNORECASE)
+
+
+class EmailBody(NamedTuple):
+    text: str
+    # e.g. "text/plain part root", "text/html parts 0.1, 1", "snippet"
+    source: str
+    truncated: bool
+
+
+def _charset(part: dict) -> str:
+    for header in part.get('headers', []):
+        if header.get('name', '').lower() == 'content-type':
+            m = _CHARSET_RE.search(header.get('value', ''))
+            if m:
+                try:
+                    return codecs.lookup(m.group(1)).name
+                except LookupError:
+                    break
+    return 'utf-8'
+
+
+def iter_parts(payload: dict, mime_type: str) -> Iterator[dict]:
+    """Yield inline parts of one MIME type that carry body data, in document order."""
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        children = part.get('parts')
+        if children:
+            stack.extend(reversed(children))
+        elif (part.get('mimeType', '').lower() == mime_type
+              and part.get('body', {}).get('data') and not part.get('filename')):
+            yield part
+
+
+def iter_text(part: dict) -> Iterator[str]:
+    """Decode a part's body a chunk at a time; stops quietly at corrupt data."""
+    data = part['body']['data']
+    decoder = codecs.getincrementaldecoder(_charset(part))(errors='ignore')
+    for start in range(0, len(data), CHUNK_CHARS):
+        chunk = data[start:start + CHUNK_CHARS]
+        chunk += '=' * (-len(chunk) % 4)
+        try:
+            raw = base64.urlsafe_b64decode(chunk)
+        except (binascii.Error, ValueError):
+            break
+        text = decoder.decode(raw)
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+class HTMLTextExtractor(HTMLParser):
+    """Incremental HTML-to-text tokenizer; feed() it decoded chunks in order.
+
+    html.parser holds back a tag, comment or character reference cut off at
+    the end of a chunk until the next one completes it. Text inside hidden
+    elements is dropped and block elements become line breaks.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pieces: list[str] = []
+        # Characters collected so far, before whitespace is collapsed
+        self.length = 0
+        self.hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _HIDDEN_TAGS:
+            self.hidden += 1
+        elif tag == 'body':
+            self.hidden = 0  # an unclosed <head> ends here
+        elif tag in _BLOCK_TAGS:
+            self.pieces.append(_BREAK)
+
+    def handle_endtag(self, tag):
+        if tag in _HIDDEN_TAGS:
+            self.hidden = max(self.hidden - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self.pieces.append(_BREAK)
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.pieces.append(data.replace(_BREAK, ''))
+            self.length += len(data)
+
+    def parse_marked_section(self, i, report=1):
+        try:
+            return super().parse_marked_section(i, report)
+        except AssertionError:
+            # "<![foo[ ... ]>": html.parser gives up; browsers skip it like a comment
+            j = self.rawdata.find('>', i)
+            return j + 1 if j != -1 else -1
+
+    def text(self) -> str:
+        """One space between words, one line break between blocks."""
+        text = ' '.join(''.join(self.pieces).split())
+        text = text.replace(' ' + _BREAK, _BREAK).replace(_BREAK + ' ', _BREAK)
+        return '\n'.join(filter(None, text.split(_BREAK)))
+
+
+def html_to_text(html: str) -> str:
+    """Readable text of a whole HTML document."""
+    parser = HTMLTextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+def _plain_part(part: dict, budget: int) -> tuple[str, bool]:
+    out, length = [], 0
+    for text in iter_text(part):
+        out.append(text)
+        length += len(text)
+        if length > budget:
+            return ''.join(out)[:budget], True
+    return ''.join(out), False
+
+
+def _html_part(part: dict, budget: int) -> tuple[str, bool]:
+    parser = HTMLTextExtractor()
+    for chunk in iter_text(part):
+        parser.feed(chunk)
+        # Collapsing only shortens the text, so skip it until it could be enough
+        if parser.length > budget:
+            text = parser.text()
+            if len(text) > budget:
+                return text[:budget], True
+    parser.close()
+    return parser.text(), False
+
+
+def part_text(part: dict, budget: int) -> tuple[str, bool]:
+    """Up to `budget` characters of a part's readable text, and whether it was cut."""
+    if part.get('mimeType', '').lower() == 'text/html':
+        return _html_part(part, budget)
+    return _plain_part(part, budget)
+
+
+def _collect(parts: Iterator[dict], limit: int, sep: str) -> tuple[str, list[str], bool]:
+    out, used, length = [], [], 0
+    for part in parts:
+        used.append(part.get('partId', ''))
+        budget = limit - length - (len(sep) if out else 0)
+        text, truncated = part_text(part, max(budget, 0))
+        if text:
+            if out:
+                text = sep + text
+            out.append(text)
+            length += len(text)
+        if truncated:
+            return ''.join(out), used, True
+    return ''.join(out), used, False
+
+
+def extract_body(msg: dict, limit: int = MAX_BODY_CHARS) -> EmailBody:
+    """Readable text of a message, its source parts, and whether it was cut."""
+    payload = msg.get('payload', {})
+    # Plain parts run on as before; HTML parts are separate blocks
+    for mime_type, sep in (('text/plain', ''), ('text/html', '\n')):
+        parts = iter_parts(payload, mime_type)
+        first = next(parts, None)
+        if first is None:
+            continue
+        text, used, truncated = _collect(itertools.chain([first], parts), limit, sep)
+        ids = ', '.join(p or 'root' for p in used)
+        label = 'parts' if len(used) > 1 else 'part'
+        return EmailBody(text, f'{mime_type} {label} {ids}', truncated)
+
+    # Last resort: snippet
+    return EmailBody(msg.get('snippet', ''), 'snippet', False)
@@ -1,44 +1,183 @@
 # filesystem_watcher.py - Monitors Inbox/ for new file drops
+#
+# Watchdog events (created, modified, moved in) only nominate a path; the
+# watcher loop ingests it once its size and mtime have stayed unchanged for
+# STABLE_SECONDS and it can be opened, so a large copy still in progress
+# produces one task with the final size rather than one per write.
+#
+# Each drop is hashed and checked against the drop ledger; a copy of a file
+# already ingested is noted on the original task (wherever it has moved to)
+# instead of creating one.
+import os
+import queue
 import time
 from pathlib import Path
 from datetime import datetime
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from audit_logger import audit_log
 from base_watcher import BaseWatcher
+from drop_ledger import DropLedger, guess_mime, hash_file
+
+# Seconds a dropped file's size and mtime must stay unchanged before ingestion
+STABLE_SECONDS = float(os.getenv('INBOX_STABLE_SECONDS', '2'))
+
+# In-progress download names; the finished file arrives via a rename
+TEMP_SUFFIXES = ('.part', '.partial', '.crdownload', '.download', '.tmp')
+
+# Where a FILE_* task can be by the time a duplicate arrives, in workflow order
+TASK_FOLDERS = ('Needs_Action', 'In_Progress', 'Pending_Approval', 'Approved',
+                'Done', 'Rejected', 'Plans')
+
+
+def is_candidate(path: Path) -> bool:
+    """True for files worth ingesting (not hidden, lock or partial-download files)."""
+    name = path.name
+    return not (name.startswith(('.', '~$')) or name.lower().endswith(TEMP_SUFFIXES))
 
 
 class InboxHandler(FileSystemEventHandler):
-    """Watchdog handler that collects new files dropped into Inbox/."""
+    """Watchdog handler that queues Inbox/ paths touched by file events.
 
-    def __init__(self):
-        self.pending_files = []
+    Runs on the observer thread; the queue is the only state it shares with
+    the watcher loop. Each entry is ('seen', path) or ('gone', path), and
+    on_event (the watcher's wake()) is called after each put.
+    """
+
+    def __init__(self, inbox: Path, on_event=None):
+        self.inbox = inbox
+        self.events: queue.Queue = queue.Queue()
+        self.on_event = on_event or (lambda: None)
+
+    def _put(self, kind: str, path: Path):
+        self.events.put((kind, path))
+        self.on_event()
+
+    def _seen(self, path: str):
+        path = Path(path)
+        if path.parent == self.inbox and is_candidate(path):
+            self._put('seen', path)
 
     def on_created(self, event):
         if not event.is_directory:
-            self.pending_files.append(Path(event.src_path))
+            self._seen(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._seen(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._put('gone', Path(event.src_path))
+            self._seen(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._put('gone', Path(event.src_path))
 
 
 class FileSystemWatcher(BaseWatcher):
     def __init__(self, vault_path: str):
-        super().__init__(vault_path, check_interval=5)
+        # Events wake the loop; polling only re-checks files still settling
+        super().__init__(vault_path, check_interval=1, min_interval=0.5, max_interval=60)
         self.inbox = self.vault_path / 'Inbox'
         self.inbox.mkdir(exist_ok=True)
-        self.handler = InboxHandler()
+        # path → (size, mtime_ns, monotonic time that signature was first seen)
+        self.pending: dict[Path, tuple[int, int, float]] = {}
+        # path → (size, mtime_ns) settled this cycle, not yet turned into a task
+        self.settled: dict[Path, tuple[int, int]] = {}
+        # path → (size, mtime_ns) already turned into a task
+        self.ingested: dict[Path, tuple[int, int]] = {}
+        self.ledger = DropLedger(self.vault_path / 'Logs' / 'inbox_drops.db')
+        self.handler = InboxHandler(self.inbox.resolve(), on_event=self.wake)
         self.observer = Observer()
-        self.observer.schedule(self.handler, str(self.inbox), recursive=False)
+        self.observer.schedule(self.handler, str(self.inbox.resolve()), recursive=False)
         self.observer.start()
-        self.logger.info(f'Watching {self.inbox} for new files')
+        self.logger.info(f'Watching {self.inbox} for new files (stable after {STABLE_SECONDS}s)')
+
+    def _drain_events(self):
+        """Fold queued watchdog events into the pending set, one entry per path."""
+        now = time.monotonic()
+        while True:
+            try:
+                kind, path = self.handler.events.get_nowait()
+            except queue.Empty:
+                return
+            if kind == 'gone':
+                self.pending.pop(path, None)
+                self.ingested.pop(path, None)
+            elif path not in self.pending:
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    continue
+                self.pending[path] = (st.st_size, st.st_mtime_ns, now)
+
+    def busy(self) -> bool:
+        return bool(self.pending)
+
+    @staticmethod
+    def _readable(path: Path) -> bool:
+        # Windows keeps files being copied locked against readers
+        try:
+            with open(path, 'rb'):
+                return True
+        except OSError:
+            return False
 
     def check_for_updates(self) -> list:
-        """Return list of new files detected by watchdog."""
-        items = list(self.handler.pending_files)
-        self.handler.pending_files.clear()
-        # Filter out files that no longer exist (moved/deleted quickly)
-        return [f for f in items if f.exists()]
+        """Return Inbox/ files whose size and mtime have settled, once each."""
+        self._drain_events()
+        now = time.monotonic()
+        ready = []
+        for path, (size, mtime_ns, since) in list(self.pending.items()):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                del self.pending[path]
+                continue
+            signature = (st.st_size, st.st_mtime_ns)
+            if signature != (size, mtime_ns):
+                # Still being written — restart the window
+                self.pending[path] = (*signature, now)
+                continue
+            if now - since < STABLE_SECONDS or not self._readable(path):
+                continue
+            del self.pending[path]
+            if self.ingested.get(path) == signature:
+                continue  # e.g. a metadata-only touch of a file already handled
+            self.settled[path] = signature
+            ready.append(path)
+        return sorted(ready)
+
+    def run_cycle(self) -> int:
+        """Create a task per settled file; one that fails goes back to pending."""
+        items = self.check_for_updates()
+        for path in items:
+            signature = self.settled.pop(path)
+            try:
+                self.create_action_file(path)
+            except Exception as e:
+                # Retried after another stable window, like a fresh drop
+                self.logger.error(f'Failed to ingest {path.name}, will retry: {e}')
+                self.pending[path] = (*signature, time.monotonic())
+                continue
+            self.ingested[path] = signature
+        return len(items)
 
     def create_action_file(self, filepath: Path) -> Path:
-        """Create a task file in Needs_Action/ for the dropped file."""
+        """Create a task file in Needs_Action/ for the dropped file.
+
+        If the same content was already ingested, notes the drop on the
+        original task and returns that instead.
+        """
         stat = filepath.stat()
+        sha256 = hash_file(filepath)
+        original = self.ledger.find(sha256)
+        if original:
+            return self._link_duplicate(filepath, sha256, original)
+
+        mime_type = guess_mime(filepath)
         now = datetime.now()
         safe_name = filepath.stem.replace(' ', '_')
 
@@ -47,6 +186,8 @@ type: file_drop
 filename: {filepath.name}
 source_path: {filepath}
 size_bytes: {stat.st_size}
+sha256: {sha256}
+mime_type: {mime_type}
 detected: {now.isoformat()}
 priority: normal
 status: pending
@@ -56,6 +197,7 @@ status: pending
 
 **File:** `{filepath.name}`
 **Size:** {stat.st_size:,} bytes
+**Type:** {mime_type}
 **Dropped:** {now.strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Suggested Actions
@@ -63,12 +205,82 @@ status: pending
 - [ ] Classify and route to appropriate workflow
 - [ ] Archive or delete after processing
 '''
-        action_file = self.needs_action / f'FILE_{safe_name}_{now.strftime("%Y%m%d_%H%M%S")}.md'
+        # Hash prefix keeps same-second drops of different files apart
+        action_file = self.needs_action / f'FILE_{safe_name}_{now.strftime("%Y%m%d_%H%M%S")}_{sha256[:8]}.md'
         action_file.write_text(content, encoding='utf-8')
+        self.ledger.record(sha256, stat.st_size, mime_type, filepath.name, action_file.name)
         self.logger.info(f'Created action file: {action_file.name} for {filepath.name}')
         return action_file
 
+    def _find_task(self, name: str) -> Path | None:
+        """Current location of a task file, which may have moved on from Needs_Action/."""
+        for folder in TASK_FOLDERS:
+            root = self.vault_path / folder
+            direct = root / name
+            if direct.is_file():
+                return direct
+            if root.is_dir():
+                # In_Progress/ keeps claimed tasks in per-zone subfolders
+                for found in root.rglob(name):
+                    return found
+        return None
+
+    def _link_duplicate(self, filepath: Path, sha256: str, original: dict) -> Path:
+        """Record a repeat drop on the original task; returns the task's current path.
+
+        If the original task is gone, writes a stub task pointing at it so
+        the drop still shows up.
+        """
+        copies = self.ledger.record_duplicate(sha256, filepath.name)
+        now = datetime.now()
+        task = self._find_task(original['task'])
+        if task is not None:
+            text = task.read_text(encoding='utf-8')
+            note = f'- Duplicate drop: `{filepath.name}` at {now.strftime("%Y-%m-%d %H:%M:%S")}\n'
+            if '## Duplicate Drops' not in text:
+                lead = '\n' if text.endswith('\n') else '\n\n'
+                note = f'{lead}## Duplicate Drops\n{note}'
+            with open(task, 'a', encoding='utf-8') as f:
+                f.write(note)
+        else:
+            safe_name = filepath.stem.replace(' ', '_')
+            task = self.needs_action / f'FILE_{safe_name}_{now.strftime("%Y%m%d_%H%M%S")}_{sha256[:8]}.md'
+            task.write_text(f'''---
+type: file_drop
+filename: {filepath.name}
+source_path: {filepath}
+sha256: {sha256}
+duplicate_of: {original['task']}
+detected: {now.isoformat()}
+priority: low
+status: pending
+---
+
+## Duplicate File Drop
+
+`{filepath.name}` has the same contents as `{original['filename']}`,
+dropped {datetime.fromtimestamp(original['first_seen']).strftime('%Y-%m-%d %H:%M')}
+(task `{original['task']}`, no longer in the vault).
+
+## Suggested Actions
+- [ ] Check whether the earlier task was completed
+- [ ] Delete the duplicate from Inbox/
+''', encoding='utf-8')
+            # Later copies are noted on the stub rather than stubbed again
+            self.ledger.relink(sha256, task.name)
+        self.logger.info(
+            f'Duplicate drop {filepath.name} matches {original["filename"]} '
+            f'(task {task.relative_to(self.vault_path)}, {copies} duplicate(s) so far)'
+        )
+        audit_log('filesystem_watcher', 'file_drop_duplicate', {
+            'file': filepath.name, 'sha256': sha256,
+            'original_file': original['filename'], 'original_task': original['task'],
+            'linked_task': str(task.relative_to(self.vault_path)),
+        })
+        return task
+
     def stop(self):
-        """Stop the watchdog observer."""
+        """Stop the run loop and the watchdog observer."""
+        super().stop()
         self.observer.stop()
         self.observer.join()
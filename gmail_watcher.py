@@ -1,164 +1,272 @@
-import base64
+import json
 import os
-import re
 import time
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from pathlib import Path
 from base_watcher import BaseWatcher
+from email_body import extract_body
+from message_ledger import MessageLedger
+from retry_handler import retry
+from sender_classifier import classify
 from datetime import datetime
 from dotenv import load_dotenv
 
-# ── Automated/marketing sender filter ────────────────────────────────────────
-
-# Domains that only send automated emails — never need a reply
-AUTOMATED_DOMAINS = {
-    'linkedin.com', 'coursera.org', 'udemy.com', 'udemy-email.com',
-    'medium.com', 'producthunt.com', 'happyscribe.co',
-    'mailchimp.com', 'sendgrid.net', 'sendgrid.com',
-    'amazonses.com', 'canva.com', 'figma.com', 'notion.so',
-    'twitter.com', 'facebook.com', 'instagram.com', 'youtube.com',
-    'hubspot.com', 'mailgun.org', 'klaviyo.com',
-}
-
-# Sender address keywords that indicate automated mail
-AUTOMATED_KEYWORDS = [
-    'noreply', 'no-reply', 'donotreply', 'do-not-reply',
-    'notifications@', 'notification@', 'alerts@', 'alert@',
-    'newsletter@', 'digest@', 'mailer@', 'mailer-daemon',
-    'jobs-listings@', 'jobs@linkedin', 'info@linkedin',
-    'updates@', 'support@coursera', 'team@producthunt',
-]
+# ── Watcher ───────────────────────────────────────────────────────────────────
 
+# Checkpoint of the last mailbox historyId fully turned into action files
+SYNC_STATE_FILE = 'gmail_sync.json'
+# IDs already written or skipped, shared by every watcher on this vault
+LEDGER_FILE = 'gmail_processed.log'
 
-def is_automated_email(headers: dict) -> bool:
-    """Return True if this email is automated/marketing and should be skipped."""
-    from_addr = headers.get('From', '').lower()
+# Full (re)sync: first run, or when the checkpoint is too old for history.list.
+# newer_than:1d ignores old unread spam; the cap bounds a resync's cost.
+FULL_SYNC_QUERY = 'is:unread newer_than:1d'
+FULL_SYNC_MAX = int(os.getenv('GMAIL_FULL_SYNC_MAX', '500'))
 
-    # Check sender address for no-reply patterns
-    for kw in AUTOMATED_KEYWORDS:
-        if kw in from_addr:
-            return True
+# New messages carrying any of these labels never need an action file
+SKIP_LABELS = {'SPAM', 'TRASH', 'DRAFT', 'SENT'}
 
-    # Check sender domain against blocked list
-    m = re.search(r'@([\w\-.]+)', from_addr)
-    if m:
-        domain = m.group(1)
-        for blocked in AUTOMATED_DOMAINS:
-            if domain == blocked or domain.endswith('.' + blocked):
-                return True
+# Batch endpoint takes up to 100 calls; Google advises 50 to avoid rate limits
+BATCH_SIZE = 50
+# Per-user quota is 250 units/s and messages.get costs 5. Gmail allows short
+# bursts, so batches are only paced to it for a while after a quota error.
+QUOTA_UNITS_PER_SECOND = 250
+GET_QUOTA_UNITS = 5
+QUOTA_PACING_SECONDS = 60
+# Headers fetched for the automated-sender filter (and the skip log)
+FILTER_HEADERS = ['From', 'Subject', 'List-Unsubscribe']
+# Per-request batch errors worth retrying
+RETRYABLE_STATUS = {429, 500, 503}
 
-    # List-Unsubscribe header is the definitive marker for bulk/marketing mail
-    if any(k.lower() == 'list-unsubscribe' for k in headers):
-        return True
 
-    return False
+def is_quota_error(error: HttpError) -> bool:
+    """429, or 403 with a (user)rateLimitExceeded reason."""
+    status = error.resp.status
+    return status == 429 or (status == 403 and b'ratelimitexceeded' in (error.content or b'').lower())
 
 
-# ── Email body extraction ─────────────────────────────────────────────────────
+class BatchRetryError(Exception):
+    """Some batched requests hit a rate limit or server error."""
 
-def _decode_b64(data: str) -> str:
-    try:
-        return base64.urlsafe_b64decode(data + '==').decode('utf-8', errors='ignore')
-    except Exception:
-        return ''
-
-
-def get_email_body(msg: dict) -> str:
-    """Extract readable plain text from the Gmail message payload."""
-    payload = msg.get('payload', {})
-
-    # Simple (non-multipart) message
-    body_data = payload.get('body', {}).get('data', '')
-    if body_data:
-        return _decode_b64(body_data)[:3000]
-
-    # Multipart — prefer text/plain, fall back to text/html
-    def extract_from_parts(parts):
-        plain = html = ''
-        for part in parts:
-            mime = part.get('mimeType', '')
-            data = part.get('body', {}).get('data', '')
-            if mime == 'text/plain' and data:
-                plain += _decode_b64(data)
-            elif mime == 'text/html' and data:
-                html += _decode_b64(data)
-            # Recurse into nested multipart
-            sub_parts = part.get('parts', [])
-            if sub_parts:
-                sp, sh = extract_from_parts(sub_parts)
-                plain += sp
-                html += sh
-        return plain, html
-
-    plain, html = extract_from_parts(payload.get('parts', []))
-    if plain:
-        return plain[:3000]
-    if html:
-        # Strip HTML tags for readability
-        text = re.sub(r'<[^>]+>', ' ', html)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text[:3000]
-
-    # Last resort: snippet
-    return msg.get('snippet', '')
 
+def message_headers(msg: dict) -> dict:
+    return {h['name']: h['value'] for h in msg.get('payload', {}).get('headers', [])}
 
-# ── Watcher ───────────────────────────────────────────────────────────────────
 
 class GmailWatcher(BaseWatcher):
-    def __init__(self, vault_path: str, credentials_path: str):
-        super().__init__(vault_path, check_interval=30)
-        self.creds = Credentials.from_authorized_user_file(credentials_path)
-        self.service = build('gmail', 'v1', credentials=self.creds)
-        self.processed_ids = set()
+    """Turns new unread Gmail messages into Needs_Action/ files.
+
+    After one bounded full listing, each cycle asks users.history.list for
+    messages added since the saved historyId, so an idle mailbox costs one
+    small request and a restart resumes where it left off. The checkpoint
+    only advances once every message in a batch has been handled.
+
+    New messages are fetched in batch requests: headers first for the
+    automated-sender filter, then full bodies for the survivors only.
+    """
+
+    def __init__(self, vault_path: str, credentials_path: str = None, service=None):
+        # Poll every 15s while mail is arriving, backing off to 2 min when quiet
+        super().__init__(vault_path, check_interval=30, min_interval=15, max_interval=120)
+        if service is None:
+            self.creds = Credentials.from_authorized_user_file(credentials_path)
+            service = build('gmail', 'v1', credentials=self.creds)
+        self.service = service
+        self.processed_ids = MessageLedger(self.vault_path / 'Logs' / LEDGER_FILE)
+        self.state_path = self.vault_path / 'Logs' / SYNC_STATE_FILE
+        self.history_id = self._load_history_id()
+        self._next_history_id = None
+        # Batches are paced to the quota until _pace_until (after a quota error)
+        self._pace_until = 0.0
+        self._next_batch_at = 0.0
+
+    def _load_history_id(self) -> str | None:
+        try:
+            return json.loads(self.state_path.read_text(encoding='utf-8'))['history_id']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def _save_history_id(self, history_id: str):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({
+            'history_id': history_id,
+            'updated': datetime.now().isoformat(),
+        }), encoding='utf-8')
+        os.replace(tmp, self.state_path)
+
+    def _full_sync(self) -> list:
+        """List recent unread mail (up to FULL_SYNC_MAX) and restart history."""
+        # Take the mailbox position first: mail arriving mid-listing then
+        # shows up again in the next history sync rather than being missed
+        start = self.service.users().getProfile(userId='me').execute()['historyId']
+        messages, page_token = [], None
+        while len(messages) < FULL_SYNC_MAX:
+            results = self.service.users().messages().list(
+                userId='me', q=FULL_SYNC_QUERY, pageToken=page_token,
+                maxResults=min(500, FULL_SYNC_MAX - len(messages)),
+            ).execute()
+            messages.extend(results.get('messages', []))
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        self._next_history_id = start
+        return messages
+
+    def _history_sync(self) -> list:
+        """Messages added since the checkpoint that are unread and not spam/sent."""
+        messages, seen, page_token = [], set(), None
+        while True:
+            results = self.service.users().history().list(
+                userId='me', startHistoryId=self.history_id,
+                historyTypes=['messageAdded'], pageToken=page_token,
+            ).execute()
+            for record in results.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message = added['message']
+                    labels = set(message.get('labelIds', []))
+                    if message['id'] in seen or 'UNREAD' not in labels or labels & SKIP_LABELS:
+                        continue
+                    seen.add(message['id'])
+                    messages.append(message)
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        self._next_history_id = results.get('historyId', self.history_id)
+        return messages
+
+    @retry(max_retries=4, base_delay=2.0, exceptions=(BatchRetryError,))
+    def _execute_batches(self, ids: list, results: dict, params: dict):
+        """Fetch ids not yet in results via batch requests, filling results."""
+        retry_ids = []
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+            elif isinstance(exception, HttpError) and is_quota_error(exception):
+                self._pace_until = time.monotonic() + QUOTA_PACING_SECONDS
+                retry_ids.append(request_id)
+            elif isinstance(exception, HttpError) and exception.resp.status in RETRYABLE_STATUS:
+                retry_ids.append(request_id)
+            elif isinstance(exception, HttpError) and exception.resp.status == 404:
+                results[request_id] = None  # deleted since it was listed
+            else:
+                raise exception
+
+        todo = [i for i in ids if i not in results]
+        for start in range(0, len(todo), BATCH_SIZE):
+            chunk = todo[start:start + BATCH_SIZE]
+            wait = self._next_batch_at - time.monotonic()
+            if wait > 0 and time.monotonic() < self._pace_until:
+                time.sleep(wait)
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for message_id in chunk:
+                batch.add(
+                    self.service.users().messages().get(userId='me', id=message_id, **params),
+                    request_id=message_id,
+                )
+            batch.execute()
+            self._next_batch_at = time.monotonic() + len(chunk) * GET_QUOTA_UNITS / QUOTA_UNITS_PER_SECOND
+        if retry_ids:
+            raise BatchRetryError(f'{len(retry_ids)} of {len(todo)} messages.get calls rate-limited')
+
+    def _batch_get(self, ids: list, **params) -> dict:
+        """messages.get for many IDs in batches of BATCH_SIZE; id → message.
+
+        Rate-limited calls are retried with backoff; deleted messages are left out.
+        """
+        results = {}
+        if ids:
+            self._execute_batches(ids, results, params)
+        return {k: v for k, v in results.items() if v is not None}
+
+    def _fetch(self, messages: list) -> list:
+        """Full messages for new mail that passes the automated-sender filter.
+
+        Headers for the whole batch come first (format='metadata'); only the
+        survivors' bodies are then fetched with format='full'.
+        """
+        ids, existing = [], []
+        for message in messages:
+            if (self.needs_action / f'EMAIL_{message["id"]}.md').exists():
+                # Written before a crash, but not yet in the ledger
+                existing.append(message['id'])
+            else:
+                ids.append(message['id'])
+        self.processed_ids.add_many(existing, 'created')
+
+        heads = self._batch_get(ids, format='metadata', metadataHeaders=FILTER_HEADERS)
+        present = [i for i in ids if i in heads]
+        headers_list = [message_headers(heads[i]) for i in present]
+        reasons = classify(headers_list, self.vault_path)
+        wanted, skipped = [], []
+        for message_id, headers, reason in zip(present, headers_list, reasons):
+            if reason:
+                sender = headers.get('From', 'unknown')
+                subject = headers.get('Subject', '')
+                print(f"[SKIP] Automated email from {sender} — '{subject}' ({reason})")
+                skipped.append(message_id)
+            else:
+                wanted.append(message_id)
+        self.processed_ids.add_many(skipped, 'skipped')
+
+        full = self._batch_get(wanted, format='full')
+        return [full[i] for i in wanted if i in full]
 
     def check_for_updates(self) -> list:
-        # Added newer_than:1d to ignore old unread spam!
-        results = self.service.users().messages().list(
-            userId='me', q='is:unread newer_than:1d'
-        ).execute()
-        messages = results.get('messages', [])
-        return [m for m in messages if m['id'] not in self.processed_ids]
-
-    def create_action_file(self, message) -> Path | None:
-        msg = self.service.users().messages().get(
-            userId='me', id=message['id'], format='full'
-        ).execute()
-
-        headers = {h['name']: h['value'] for h in msg['payload']['headers']}
-
-        # ── Filter automated/marketing emails ──────────────────────────────
-        if is_automated_email(headers):
-            sender = headers.get('From', 'unknown')
-            subject = headers.get('Subject', '')
-            print(f"[SKIP] Automated email from {sender} — "{subject}"")
-            self.processed_ids.add(message['id'])
-            return None
+        """Return full message resources for new, non-automated mail."""
+        if self.history_id is None:
+            self.logger.info('No sync checkpoint; running a full sync')
+            messages = self._full_sync()
+        else:
+            try:
+                messages = self._history_sync()
+            except HttpError as e:
+                if e.resp.status != 404:
+                    raise
+                # historyId too old (Gmail keeps roughly a week of history)
+                self.logger.warning(f'History {self.history_id} expired; running a full resync')
+                messages = self._full_sync()
+        return self._fetch([m for m in messages if m['id'] not in self.processed_ids])
+
+    def run_cycle(self) -> int:
+        count = super().run_cycle()
+        # Reached only if every message of the batch was handled without error
+        if self._next_history_id and self._next_history_id != self.history_id:
+            self.history_id = self._next_history_id
+            self._save_history_id(self.history_id)
+        return count
+
+    def create_action_file(self, msg) -> Path | None:
+        """Write EMAIL_<id>.md for a full message from check_for_updates()."""
+        filepath = self.needs_action / f'EMAIL_{msg["id"]}.md'
+        headers = message_headers(msg)
 
         # ── Extract full body ──────────────────────────────────────────────
-        body = get_email_body(msg)
+        body = extract_body(msg)
 
         content = f'''---
 type: email
 from: {headers.get('From', 'Unknown')}
 subject: {headers.get('Subject', 'No Subject')}
 received: {datetime.now().isoformat()}
+body_source: {body.source}{' (truncated)' if body.truncated else ''}
 priority: high
 status: pending
 ---
 
 ## Email Content
-{body}
+{body.text}
 
 ## Suggested Actions
 - [ ] Reply to sender
 - [ ] Forward to relevant party
 - [ ] Archive after processing
 '''
-        filepath = self.needs_action / f'EMAIL_{message["id"]}.md'
         filepath.write_text(content, encoding='utf-8')
-        self.processed_ids.add(message['id'])
+        self.processed_ids.add(msg['id'], 'created')
         return filepath
 
 if __name__ == "__main__":
@@ -168,17 +276,7 @@ if __name__ == "__main__":
 
     print("Starting WEBXES Gmail Watcher Loop...")
     watcher = GmailWatcher(vault_path=vault_path, credentials_path=token_path)
-
-    while True:
-        try:
-            updates = watcher.check_for_updates()
-            if updates:
-                print(f"Found {len(updates)} new emails! Processing...")
-                for msg in updates:
-                    filepath = watcher.create_action_file(msg)
-                    if filepath:
-                        print(f"Created action file: {filepath}")
-        except Exception as e:
-            print(f"Error checking emails: {e}")
-
-        time.sleep(30)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
@@ -24,6 +24,7 @@ from config import (
     IS_LOCAL, ensure_dirs,
 )
 from audit_logger import audit_log
+from vault_document import read_document
 
 logging.basicConfig(
     level=logging.INFO,
@@ -82,9 +83,13 @@ def process_updates():
             shutil.move(str(filepath), str(dest))
             log.info(f"Moved draft to Needs_Action/: {filepath.name}")
 
+            # Header-only read: record which email the draft answers
+            meta = read_document(dest).metadata
             audit_log("local_sync", "draft_received", {
                 "file": filepath.name,
                 "source": "cloud_agent",
+                "original_file": meta.get("original_file", ""),
+                "subject": meta.get("subject", ""),
             })
             processed += 1
 
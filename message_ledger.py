@@ -0,0 +1,170 @@
+"""
+WEBXES Tech — Processed-message ledger
+
+Remembers which Gmail message IDs have been handled (turned into an action
+file, or skipped as automated mail) so they are never fetched twice — across
+restarts and across watcher processes sharing a vault.
+
+On disk it is an append-only text log, one "<epoch> <message id> <outcome>"
+line per entry, e.g. Logs/gmail_processed.log. In memory it is a dict of
+id → time, oldest first, holding only entries newer than RETENTION_DAYS and
+at most MAX_ENTRIES of them. Mail older than the retention window can no
+longer come back through history sync or the 1-day full sync anyway.
+
+Each append is a single small O_APPEND write, so processes can share the
+log; lookups that miss first read whatever other processes appended since
+the last read. When the log holds more than twice the live entries it is
+rewritten with just those (under a lock file). An entry another process
+appends during that rewrite can be lost, which costs one extra fetch.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger("message_ledger")
+
+RETENTION_DAYS = float(os.getenv("GMAIL_LEDGER_RETENTION_DAYS", "14"))
+MAX_ENTRIES = int(os.getenv("GMAIL_LEDGER_MAX_ENTRIES", "100000"))
+# Don't bother compacting logs smaller than this
+COMPACT_MIN_BYTES = 256 * 1024
+# A compaction lock older than this is assumed abandoned
+STALE_LOCK_SECONDS = 60
+
+
+class MessageLedger:
+    """Persistent, bounded set of processed message IDs."""
+
+    def __init__(self, path: Path, retention_days: float = RETENTION_DAYS,
+                 max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention = retention_days * 86400
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # id → epoch seconds, oldest first
+        self._entries: dict[str, float] = {}
+        self._offset = 0
+        self._log_lines = 0
+        self._file_id = None
+        with self._lock:
+            self._catch_up()
+
+    # ── Disk ──────────────────────────────────────────────────────────
+
+    def _catch_up(self):
+        """Load lines appended since the last read (or everything, if the log was replaced)."""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return
+        size = st.st_size
+        if (st.st_dev, st.st_ino) != self._file_id or size < self._offset:
+            # First read, or compacted by another process — start over
+            self._entries.clear()
+            self._offset = self._log_lines = 0
+            self._file_id = (st.st_dev, st.st_ino)
+        if size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        # A line still being written has no newline yet; read it next time
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        for line in data[:end].decode("utf-8", errors="replace").splitlines():
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            try:
+                ts = float(parts[0])
+            except ValueError:
+                continue
+            self._log_lines += 1
+            self._entries.pop(parts[1], None)
+            self._entries[parts[1]] = ts
+        self._evict()
+
+    def _append(self, lines: list[str]):
+        data = "".join(lines).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def _compact(self):
+        """Rewrite the log with only live entries, if no other process is doing so."""
+        lock = self.path.with_suffix(".lock")
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime > STALE_LOCK_SECONDS:
+                    lock.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        try:
+            os.close(fd)
+            self._catch_up()
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(
+                "".join(f"{ts:.0f} {mid} -\n" for mid, ts in self._entries.items()),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self.path)
+            self._catch_up()
+            logger.info(f"Compacted {self.path.name} to {len(self._entries)} entries")
+        except OSError as e:
+            # e.g. Windows refusing to replace a file another process has open
+            logger.warning(f"Could not compact {self.path.name}: {e}")
+        finally:
+            lock.unlink(missing_ok=True)
+
+    # ── Memory ────────────────────────────────────────────────────────
+
+    def _evict(self):
+        cutoff = time.time() - self.retention
+        while self._entries:
+            oldest, ts = next(iter(self._entries.items()))
+            if ts >= cutoff and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[oldest]
+
+    # ── Public API ────────────────────────────────────────────────────
+
+    def __contains__(self, message_id: str) -> bool:
+        with self._lock:
+            if message_id in self._entries:
+                return True
+            self._catch_up()
+            return message_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, message_id: str, outcome: str = "processed"):
+        """Record one processed message."""
+        self.add_many([message_id], outcome)
+
+    def add_many(self, message_ids: Iterable[str], outcome: str = "processed"):
+        """Record processed messages with a single append."""
+        now = time.time()
+        with self._lock:
+            self._catch_up()
+            lines = []
+            for message_id in message_ids:
+                self._entries.pop(message_id, None)
+                self._entries[message_id] = now
+                lines.append(f"{now:.0f} {message_id} {outcome}\n")
+            if not lines:
+                return
+            self._append(lines)
+            # Reads our lines back, plus anything another process appended meanwhile
+            self._catch_up()
+            if self._log_lines > 2 * len(self._entries) and self._offset > COMPACT_MIN_BYTES:
+                self._compact()
@@ -86,7 +86,7 @@ def main():
         credentials_path=token_path
     )
 
-    logger.info('Gmail Watcher is now running. Polling every 120 seconds.')
+    logger.info(f'Gmail Watcher is now running. Polling every {watcher.min_interval}-{watcher.max_interval}s (adaptive).')
     logger.info('Press Ctrl+C to stop.')
 
     try:
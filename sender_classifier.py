@@ -0,0 +1,223 @@
+"""
+WEBXES Tech — Automated sender classifier
+
+Decides whether an email comes from an automated/marketing sender that never
+needs a reply. Shared by gmail_watcher (before fetching bodies) and
+cloud_agent (second line of defence before drafting).
+
+A sender is automated if its address contains one of the keywords
+(noreply, newsletter@, ...), if its domain is one of the listed domains or a
+subdomain of one, or — for full headers — if it carries List-Unsubscribe.
+
+Rules come from Sender_Rules.md at the root of the vault being processed,
+as two bullet lists under "## Automated Domains" and "## Automated
+Keywords"; without that file the built-in defaults below apply. Each
+vault's file is re-checked at most every RELOAD_INTERVAL seconds and
+recompiled when its mtime changes, so edits take effect without
+restarting the watchers.
+
+Keywords are compiled into one prefix-factored regex (a character trie, so
+a single C-level scan per sender tests them all at once) and domains into a
+reversed-label trie, so the cost of a check no longer grows with the number
+of rules.
+"""
+
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import VAULT_PATH
+
+logger = logging.getLogger("sender_classifier")
+
+RULES_FILENAME = "Sender_Rules.md"
+RELOAD_INTERVAL = 5.0
+
+# Domains that only send automated emails — never need a reply
+DEFAULT_DOMAINS = [
+    'linkedin.com', 'coursera.org', 'udemy.com', 'udemy-email.com',
+    'medium.com', 'producthunt.com', 'happyscribe.co',
+    'mailchimp.com', 'sendgrid.net', 'sendgrid.com',
+    'amazonses.com', 'canva.com', 'figma.com', 'notion.so',
+    'twitter.com', 'facebook.com', 'instagram.com', 'youtube.com',
+    'hubspot.com', 'mailgun.org', 'klaviyo.com',
+]
+
+# Sender address keywords that indicate automated mail
+DEFAULT_KEYWORDS = [
+    'noreply', 'no-reply', 'donotreply', 'do-not-reply',
+    'notifications@', 'notification@', 'alerts@', 'alert@',
+    'newsletter@', 'digest@', 'mailer@', 'mailer-daemon',
+    'jobs-listings@', 'jobs@linkedin', 'info@linkedin',
+    'updates@', 'support@coursera', 'team@producthunt',
+]
+
+_SECTIONS = {"automated domains": "domains", "automated keywords": "keywords"}
+_DOMAIN_RE = re.compile(r'@([\w\-.]+)')
+_END = ""  # trie key marking the end of a listed domain
+
+
+def parse_rules(text: str) -> dict[str, list[str]]:
+    """Read the domain/keyword bullet lists from a Sender_Rules.md body."""
+    rules: dict[str, list[str]] = {"domains": [], "keywords": []}
+    section = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            section = _SECTIONS.get(stripped.lstrip("#").strip().lower())
+        elif section and stripped.startswith(("- ", "* ")):
+            value = stripped[2:].strip().strip("`").lower()
+            if value:
+                rules[section].append(value)
+    return rules
+
+
+def keyword_pattern(keywords: list[str]) -> str:
+    """Regex matching any keyword, factored along shared prefixes.
+
+    ['alert@', 'alerts@'] becomes 'alert(?:@|s@)', so the regex engine
+    follows one branch per character instead of trying every keyword.
+    A keyword that is a prefix of another becomes an optional tail, which
+    still prefers the longer match.
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[_END] = True
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != _END]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if _END in node:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class SenderClassifier:
+    """Compiled keyword automaton plus domain suffix trie."""
+
+    def __init__(self, domains: list[str], keywords: list[str]):
+        keywords = {k.lower() for k in keywords if k}
+        self._keywords = re.compile(keyword_pattern(keywords)) if keywords else None
+        self._trie: dict = {}
+        for domain in domains:
+            node = self._trie
+            for label in reversed(domain.lower().strip(".").split(".")):
+                node = node.setdefault(label, {})
+            node[_END] = domain
+
+    def _domain_rule(self, domain: str) -> Optional[str]:
+        node = self._trie
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                return None
+            if _END in node:
+                return node[_END]
+        return None
+
+    def sender_reason(self, sender: str) -> Optional[str]:
+        """Why a From value is automated ("keyword:..."/"domain:..."), or None."""
+        sender = sender.lower()
+        if self._keywords is not None:
+            m = self._keywords.search(sender)
+            if m:
+                return f"keyword:{m.group(0)}"
+        m = _DOMAIN_RE.search(sender)
+        if m:
+            rule = self._domain_rule(m.group(1))
+            if rule:
+                return f"domain:{rule}"
+        return None
+
+    def headers_reason(self, headers: dict) -> Optional[str]:
+        """Why a message's headers mark it automated, or None."""
+        sender = ""
+        for name, value in headers.items():
+            lowered = name.lower()
+            if lowered == "list-unsubscribe":
+                # The definitive marker for bulk/marketing mail
+                return "list-unsubscribe"
+            if lowered == "from":
+                sender = value
+        return self.sender_reason(sender)
+
+
+class _RulesLoader:
+    """Holds the classifier for a rules file, recompiling when the file changes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+        self._classifier = SenderClassifier(DEFAULT_DOMAINS, DEFAULT_KEYWORDS)
+
+    def get(self) -> SenderClassifier:
+        now = time.monotonic()
+        if now - self._checked < RELOAD_INTERVAL:
+            return self._classifier
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = self.path.stat().st_mtime
+            except FileNotFoundError:
+                mtime = None
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self._classifier = self._load()
+        return self._classifier
+
+    def _load(self) -> SenderClassifier:
+        if self._mtime is None:
+            return SenderClassifier(DEFAULT_DOMAINS, DEFAULT_KEYWORDS)
+        try:
+            rules = parse_rules(self.path.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not read {self.path.name}, keeping current rules: {e}")
+            return self._classifier
+        logger.info(
+            f"Loaded {self.path.name}: {len(rules['domains'])} domains, "
+            f"{len(rules['keywords'])} keywords"
+        )
+        return SenderClassifier(rules["domains"], rules["keywords"])
+
+
+# One loader per vault, keyed by its resolved path
+_loaders: dict[Path, _RulesLoader] = {}
+_loaders_lock = threading.Lock()
+
+
+def get_classifier(vault_path: Optional[Path] = None) -> SenderClassifier:
+    """Current classifier for a vault (default VAULT_PATH), reloaded if its Sender_Rules.md changed."""
+    root = Path(vault_path or VAULT_PATH).resolve()
+    loader = _loaders.get(root)
+    if loader is None:
+        with _loaders_lock:
+            loader = _loaders.setdefault(root, _RulesLoader(root / RULES_FILENAME))
+    return loader.get()
+
+
+def is_automated_sender(sender: str, vault_path: Optional[Path] = None) -> bool:
+    """Return True if the sender is automated/marketing — no reply needed."""
+    return get_classifier(vault_path).sender_reason(sender) is not None
+
+
+def is_automated_email(headers: dict, vault_path: Optional[Path] = None) -> bool:
+    """Return True if this email is automated/marketing and should be skipped."""
+    return get_classifier(vault_path).headers_reason(headers) is not None
+
+
+def classify(headers_list: list[dict], vault_path: Optional[Path] = None) -> list[Optional[str]]:
+    """Classify many messages' headers at once; a reason string or None each."""
+    classifier = get_classifier(vault_path)
+    return [classifier.headers_reason(headers) for headers in headers_list]
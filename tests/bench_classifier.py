@@ -0,0 +1,103 @@
+"""
+WEBXES Tech — Sender classifier benchmark
+
+Classifies a synthetic corpus of From headers (default 100,000: client
+mail, automated senders, look-alike domains such as notlinkedin.com, and
+subdomains such as e.linkedin.com) with the old per-rule loops that
+gmail_watcher and cloud_agent used and with the compiled classifier, and
+checks both give the same verdict for every sender.
+
+Usage:
+    python tests/bench_classifier.py [--senders N] [--runs N]
+"""
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+import sender_classifier
+from sender_classifier import DEFAULT_DOMAINS, DEFAULT_KEYWORDS, SenderClassifier
+
+
+def legacy_is_automated(sender: str) -> bool:
+    """The loop both modules used before the shared classifier."""
+    sender_lower = sender.lower()
+    for kw in DEFAULT_KEYWORDS:
+        if kw in sender_lower:
+            return True
+    m = re.search(r'@([\w\-.]+)', sender_lower)
+    if m:
+        domain = m.group(1)
+        for blocked in DEFAULT_DOMAINS:
+            if domain == blocked or domain.endswith('.' + blocked):
+                return True
+    return False
+
+
+def corpus(n: int) -> list[str]:
+    random.seed(11)
+    people = ["Ali Khan", "Sara Ahmed", "John Smith", "Maria Garcia", "Wei Chen", "Fatima Noor"]
+    client_domains = ["gmail.com", "outlook.com", "client.pk", "acme-corp.com", "startup.io",
+                      "notlinkedin.com", "mymedium.org", "figmaexperts.net"]
+    locals_ = ["info", "hello", "sara.ahmed", "ceo", "accounts", "jobs", "team", "support"]
+    senders = []
+    for _ in range(n):
+        roll = random.random()
+        name = random.choice(people)
+        if roll < 0.2:
+            addr = f"{random.choice(DEFAULT_KEYWORDS).rstrip('@')}@{random.choice(client_domains)}"
+        elif roll < 0.4:
+            sub = random.choice(["", "e.", "mail.", "em.news."])
+            addr = f"{random.choice(locals_)}@{sub}{random.choice(DEFAULT_DOMAINS)}"
+        else:
+            addr = f"{random.choice(locals_)}{random.randint(1, 999)}@{random.choice(client_domains)}"
+        senders.append(f"{name} <{addr}>")
+    return senders
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark automated-sender classification")
+    parser.add_argument("--senders", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    senders = corpus(args.senders)
+    classifier = SenderClassifier(DEFAULT_DOMAINS, DEFAULT_KEYWORDS)
+    headers = [{"From": s, "Subject": "Hello"} for s in senders]
+    # A vault without Sender_Rules.md, so classify() uses the same defaults
+    empty_vault = tempfile.TemporaryDirectory()
+
+    def best(func) -> float:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    legacy = [legacy_is_automated(s) for s in senders]
+    compiled = [classifier.sender_reason(s) is not None for s in senders]
+    batch = [r is not None for r in sender_classifier.classify(headers, empty_vault.name)]
+
+    t_legacy = best(lambda: [legacy_is_automated(s) for s in senders])
+    t_compiled = best(lambda: [classifier.sender_reason(s) for s in senders])
+    t_batch = best(lambda: sender_classifier.classify(headers, empty_vault.name))
+
+    print(f"{args.senders:,} senders, {sum(legacy):,} automated, best of {args.runs}:")
+    print(f"  legacy loops          {t_legacy * 1000:8.1f} ms  ({t_legacy / args.senders * 1e9:6.0f} ns/sender)")
+    print(f"  compiled classifier   {t_compiled * 1000:8.1f} ms  ({t_compiled / args.senders * 1e9:6.0f} ns/sender)"
+          f"  {t_legacy / t_compiled:4.1f}x")
+    print(f"  classify(headers)     {t_batch * 1000:8.1f} ms  ({t_batch / args.senders * 1e9:6.0f} ns/sender)"
+          f"  {t_legacy / t_batch:4.1f}x")
+    print("Verdicts identical" if legacy == compiled == batch else "Verdicts DIFFER")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+WEBXES Tech — Email body extraction benchmark
+
+Times email_body.extract_body against the old decode-everything-then-regex
+extractor on tag-dense HTML newsletters and lightly marked-up HTML mail,
+at a range of sizes. Note that the old extractor returned a single-part
+text/html body raw, tags and all, so for "HTML, single part" it only
+decodes; "HTML in multipart/related" is the like-for-like comparison.
+Correctness checks live in check_email_body.py.
+
+Usage:
+    python tests/bench_email_body.py [--sizes-kb 20,50,100] [--runs N]
+"""
+
+import argparse
+import base64
+import re
+import sys
+import time
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+from check_email_body import leaf, message, multipart, newsletter_html
+from email_body import extract_body
+
+
+# ── Old extractor (before streaming) ──────────────────────────────────────────
+
+def _legacy_decode_b64(data: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(data + '==').decode('utf-8', errors='ignore')
+    except Exception:
+        return ''
+
+
+def legacy_get_email_body(msg: dict) -> str:
+    payload = msg.get('payload', {})
+    body_data = payload.get('body', {}).get('data', '')
+    if body_data:
+        return _legacy_decode_b64(body_data)[:3000]
+
+    def extract_from_parts(parts):
+        plain = html = ''
+        for part in parts:
+            mime = part.get('mimeType', '')
+            data = part.get('body', {}).get('data', '')
+            if mime == 'text/plain' and data:
+                plain += _legacy_decode_b64(data)
+            elif mime == 'text/html' and data:
+                html += _legacy_decode_b64(data)
+            sub_parts = part.get('parts', [])
+            if sub_parts:
+                sp, sh = extract_from_parts(sub_parts)
+                plain += sp
+                html += sh
+        return plain, html
+
+    plain, html = extract_from_parts(payload.get('parts', []))
+    if plain:
+        return plain[:3000]
+    if html:
+        text = re.sub(r'<[^>]+>', ' ', html)
+        text = re.sub(r'\s+', ' ', text).strip()
+        return text[:3000]
+    return msg.get('snippet', '')
+
+
+def article_html(kb: int) -> str:
+    """Lightly marked-up HTML mail (mostly paragraphs of text)."""
+    para = ('<p>Thanks for the call today. As discussed, the revised quote covers the '
+            'second phase, the <b>hosting</b> and three months of support &mdash; see '
+            '<a href="https://example.com/q">the quote</a> for the breakdown.</p>\n')
+    return f'<html><body><div>{para * (kb * 1024 // len(para))}</div></body></html>'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark email body extraction")
+    parser.add_argument("--sizes-kb", default="20,50,100,250,500",
+                        help="comma-separated HTML sizes to time")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    def best(func) -> float:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    print(f"Best of {args.runs}, legacy (decode all + regex) vs extract_body:")
+    for kb in (int(k) for k in args.sizes_kb.split(",")):
+        newsletter = newsletter_html(kb)
+        cases = (
+            ("newsletter, HTML single part", message(leaf('text/html', newsletter))),
+            ("newsletter, HTML related", message(multipart(
+                'multipart/related', leaf('text/html', newsletter)))),
+            ("newsletter, plain + HTML", message(multipart(
+                'multipart/alternative',
+                leaf('text/plain', 'Weekly digest. ' * 400),
+                leaf('text/html', newsletter)))),
+            ("article, HTML related", message(multipart(
+                'multipart/related', leaf('text/html', article_html(kb))))),
+        )
+        for label, msg in cases:
+            t_legacy = best(lambda: legacy_get_email_body(msg))
+            t_new = best(lambda: extract_body(msg))
+            print(f"  {kb:4d} KB {label:<30} legacy {t_legacy * 1000:6.2f} ms   "
+                  f"new {t_new * 1000:6.2f} ms   {t_legacy / t_new:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+WEBXES Tech — Frontmatter parser benchmark
+
+Compares the shared streaming parser (vault_document.read_document) with
+the three parsers it replaced, on a real corpus (Pending_Approval/ by
+default). Each run parses every file for metadata + a 200-char preview,
+the work a dashboard listing does. Also reports how many files each
+legacy parser disagrees with on metadata.
+
+Vault drafts are small (~1 KB), so the streaming parser mainly pays off
+on long bodies (quoted threads, pasted attachments); --pad-kb runs the
+same comparison on a temporary copy of the corpus with each body padded.
+
+Usage:
+    python tests/bench_frontmatter.py [DIRECTORY] [--runs N] [--pad-kb KB]
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+from config import PENDING_APPROVAL
+from vault_document import PREVIEW_BYTES, READ_BLOCK, read_document
+
+PREVIEW_CHARS = 200
+
+
+# ── Legacy parsers (as they were before vault_document) ───────────────
+
+def legacy_api(path: Path) -> tuple[dict, str]:
+    """api/utils/file_parser.parse_frontmatter."""
+    text = path.read_text(encoding="utf-8")
+    if not text.startswith("---"):
+        return {}, text
+    end_match = re.search(r"\n---\s*\n", text[3:])
+    if not end_match:
+        return {}, text
+    front_end = end_match.end() + 3
+    front_text = text[3:front_end - 4].strip()
+    body = text[front_end:].strip()
+    metadata = {}
+    for line in front_text.split("\n"):
+        line = line.strip()
+        if ":" in line:
+            key, _, value = line.partition(":")
+            metadata[key.strip()] = value.strip()
+    return metadata, body
+
+
+def legacy_split(text: str) -> dict:
+    """cloud_agent / approval_watcher parse_frontmatter."""
+    if not text.startswith("---"):
+        return {}
+    parts = text.split("---", 2)
+    if len(parts) < 3:
+        return {}
+    meta = {}
+    for line in parts[1].strip().split("\n"):
+        if ":" in line:
+            key, _, val = line.partition(":")
+            meta[key.strip()] = val.strip()
+    return meta
+
+
+def run_legacy_api(files):
+    for f in files:
+        meta, body = legacy_api(f)
+        body[:PREVIEW_CHARS]
+
+
+def run_legacy_split(files):
+    # cloud_agent read the file twice: once to parse, once for content
+    for f in files:
+        legacy_split(f.read_text(encoding="utf-8"))
+        f.read_text(encoding="utf-8")
+
+
+def run_streaming(files):
+    for f in files:
+        doc = read_document(f)
+        doc.preview[:PREVIEW_CHARS]
+
+
+def bench(name: str, fn, files, runs: int):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(files)
+        best = min(best, time.perf_counter() - start)
+    per_file = best / len(files) * 1e6
+    print(f"  {name:<28} {best * 1000:8.1f} ms   {per_file:7.1f} µs/file")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vault frontmatter parsers")
+    parser.add_argument("directory", nargs="?", default=str(PENDING_APPROVAL))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pad-kb", type=int, default=0, help="pad each body by this many KB")
+    args = parser.parse_args()
+
+    files = sorted(Path(args.directory).rglob("*.md"))
+    if not files:
+        print(f"No markdown files under {args.directory}")
+        return
+
+    if args.pad_kb:
+        tmp = tempfile.TemporaryDirectory()
+        padding = ("> quoted reply line for benchmark padding\n" * 24 * args.pad_kb)
+        padded = []
+        for i, f in enumerate(files):
+            dest = Path(tmp.name) / f"{i:05d}_{f.name}"
+            dest.write_text(f.read_text(encoding="utf-8") + "\n" + padding, encoding="utf-8")
+            padded.append(dest)
+        files = padded
+
+    total_bytes = sum(f.stat().st_size for f in files)
+    print(f"Corpus: {len(files)} files, {total_bytes / 1024:.0f} KB in {args.directory}"
+          + (f" (padded +{args.pad_kb} KB each)" if args.pad_kb else ""))
+    print(f"Best of {args.runs} runs (metadata + {PREVIEW_CHARS}-char preview):")
+
+    old = bench("legacy api parser", run_legacy_api, files, args.runs)
+    bench("legacy cloud/approval parser", run_legacy_split, files, args.runs)
+    new = bench("vault_document (streaming)", run_streaming, files, args.runs)
+    print(f"  speedup vs api parser: {old / new:.1f}x")
+
+    streamed = 0
+    for f in files:
+        size = f.stat().st_size
+        needed = read_document(f)._body_offset + PREVIEW_BYTES
+        streamed += min(size, -(-needed // READ_BLOCK) * READ_BLOCK)
+    print(f"Bytes read per pass: legacy {total_bytes / 1024:.0f} KB, streaming {streamed / 1024:.0f} KB")
+
+    api_diff = split_diff = 0
+    for f in files:
+        meta = read_document(f).metadata
+        api_diff += legacy_api(f)[0] != meta
+        split_diff += legacy_split(f.read_text(encoding="utf-8")) != meta
+    print(f"Metadata differences: api parser {api_diff}, cloud/approval parser {split_diff}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+WEBXES Tech — Gmail fetch pipeline benchmark
+
+Delivers a burst of new mail (a mix of client mail and automated
+newsletters/notifications) into FakeGmail with a fixed per-round-trip
+latency, then compares:
+
+  - before: one messages.get(format='full') per message, in sequence,
+    filtering automated senders after the full download
+  - after:  GmailWatcher's pipeline — batched format='metadata' for all,
+    filter on headers, batched format='full' for the survivors only
+
+reporting HTTP round trips, quota units and wall time, and checks both
+produce the same action files.
+
+Usage:
+    python tests/bench_gmail_fetch.py [--messages N] [--automated 0.7] [--latency-ms MS]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+from fake_gmail import FakeGmail
+
+AUTOMATED_SENDERS = [
+    "LinkedIn <jobs-listings@linkedin.com>", "Coursera <no-reply@coursera.org>",
+    "Canva <marketing@engage.canva.com>", "GitHub <notifications@github.com>",
+]
+
+
+def fill(gmail: FakeGmail, count: int, automated_share: float):
+    random.seed(3)
+    body = "Hello,\n\n" + "We would like to discuss the next phase of the project. " * 40
+    for i in range(count):
+        if random.random() < automated_share:
+            gmail.add_message(random.choice(AUTOMATED_SENDERS), f"Weekly digest {i}", body,
+                              headers={"List-Unsubscribe": "<mailto:unsub@example.com>"})
+        else:
+            gmail.add_message(f"Client {i} <client{i}@example.pk>", f"Project question {i}", body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched Gmail fetching")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--automated", type=float, default=0.7)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["VAULT_PATH"] = tmp.name
+    import gmail_watcher
+    from gmail_watcher import GmailWatcher
+    from sender_classifier import is_automated_email
+
+    results = {}
+    for mode in ("before", "after"):
+        vault = Path(tmp.name) / mode
+        (vault / "Needs_Action").mkdir(parents=True)
+        gmail = FakeGmail(latency=args.latency_ms / 1000)
+        watcher = GmailWatcher(vault, service=gmail)
+        watcher.run_cycle()  # empty mailbox: sets the history checkpoint
+        fill(gmail, args.messages, args.automated)
+        gmail.calls.clear()
+
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            if mode == "before":
+                for stub in watcher._history_sync():
+                    msg = gmail.users().messages().get(userId="me", id=stub["id"], format="full").execute()
+                    if not is_automated_email(gmail_watcher.message_headers(msg), vault):
+                        watcher.create_action_file(msg)
+            else:
+                watcher.run_cycle()
+        elapsed = time.perf_counter() - start
+
+        trips = sum(n for name, n in gmail.calls.items() if "(batched)" not in name)
+        gets = sum(n for name, n in gmail.calls.items() if name.startswith("messages.get"))
+        files = sorted(p.name for p in (vault / "Needs_Action").glob("EMAIL_*.md"))
+        results[mode] = files
+        print(f"  {mode:<7} {trips:4d} HTTP round trips  {gets * gmail_watcher.GET_QUOTA_UNITS:5d} quota units  "
+              f"{elapsed:6.2f}s  {len(files)} action files")
+
+    print("Same action files" if results["before"] == results["after"] else "Action files DIFFER")
+
+
+if __name__ == "__main__":
+    print("Fetching a burst of new mail (after = batched; paced only after a quota error):")
+    main()
@@ -0,0 +1,100 @@
+"""
+WEBXES Tech — Gmail sync benchmark
+
+Runs GmailWatcher against the in-memory FakeGmail (tests/fake_gmail.py)
+in a temporary vault and compares the old full-list polling with history
+sync:
+
+  - API calls and message IDs transferred per idle cycle with N unread
+    messages in the mailbox
+  - action files re-created by a watcher restart
+  - recovery from an expired historyId (bounded full resync)
+
+Usage:
+    python tests/bench_gmail_sync.py [--unread N] [--cycles N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+from fake_gmail import FakeGmail
+
+
+def legacy_cycle(gmail: FakeGmail, processed: set) -> list:
+    """The old check_for_updates: list every unread ID, drop seen ones."""
+    results = gmail.users().messages().list(userId='me', q='is:unread newer_than:1d').execute()
+    return [m for m in results.get('messages', []) if m['id'] not in processed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Gmail incremental sync")
+    parser.add_argument("--unread", type=int, default=300)
+    parser.add_argument("--cycles", type=int, default=20)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    vault = Path(tmp.name)
+    (vault / "Needs_Action").mkdir()
+    (vault / "Logs").mkdir()
+    os.environ["VAULT_PATH"] = str(vault)
+    from gmail_watcher import GmailWatcher
+
+    gmail = FakeGmail()
+    for i in range(args.unread):
+        gmail.add_message(f"Client {i} <client{i}@example.pk>", f"Project question {i}", "Hello, any update?")
+
+    # Old behaviour: ID listing per cycle; a restart forgets processed IDs
+    processed = set()
+    for m in legacy_cycle(gmail, processed):
+        processed.add(m["id"])
+    gmail.calls.clear()
+    transferred = sum(len(gmail.users().messages().list(userId='me', q='is:unread').execute().get('messages', []))
+                      for _ in range(args.cycles))
+    legacy_calls = sum(gmail.calls.values())
+    print(f"Old full-list polling, {args.unread} unread:")
+    print(f"  idle cycles: {legacy_calls / args.cycles:.1f} calls, {transferred / args.cycles:.0f} IDs per cycle "
+          f"(first list page only)")
+    print(f"  after restart: {len(legacy_cycle(gmail, set()))} action files re-created")
+
+    # New behaviour
+    watcher = GmailWatcher(vault, service=gmail)
+    gmail.calls.clear()
+    created = watcher.run_cycle()
+    print("History sync:")
+    print(f"  first run (full sync): {created} messages, {dict(gmail.calls)}")
+
+    gmail.calls.clear()
+    for _ in range(args.cycles):
+        watcher.run_cycle()
+    print(f"  idle cycles: {sum(gmail.calls.values()) / args.cycles:.1f} calls, 0 IDs per cycle")
+
+    gmail.add_message("New Lead <lead@newco.pk>", "Quote request", "Can you quote a website?")
+    gmail.add_message("Spam <x@spam.biz>", "Win", "", labels=("SPAM", "UNREAD"))
+    gmail.calls.clear()
+    created = watcher.run_cycle()
+    print(f"  2 new arrivals (1 spam): {created} processed, {dict(gmail.calls)}")
+
+    restarted = GmailWatcher(vault, service=gmail)
+    before = len(list((vault / "Needs_Action").glob("EMAIL_*.md")))
+    restarted.run_cycle()
+    after = len(list((vault / "Needs_Action").glob("EMAIL_*.md")))
+    print(f"  after restart: {after - before} action files re-created "
+          f"(resumed from historyId {restarted.history_id})")
+
+    gmail.add_message("Late <late@client.pk>", "Following up", "Hello again")
+    gmail.expire_history()
+    gmail.calls.clear()
+    created = restarted.run_cycle()
+    after_resync = len(list((vault / "Needs_Action").glob("EMAIL_*.md")))
+    print(f"  expired historyId: full resync, {created} processed, {after_resync - after} new action file(s), "
+          f"{dict(gmail.calls)}")
+
+
+if __name__ == "__main__":
+    main()
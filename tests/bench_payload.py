@@ -0,0 +1,88 @@
+"""
+WEBXES Tech — List payload benchmark
+
+Builds a synthetic vault (see bench_search.py), takes one page of
+Pending_Approval/ items and compares the old response path (FastAPI
+jsonable_encoder + stdlib JSONResponse) with the compact one
+(FastJSONResponse, optional ?fields= selection), reporting serialize time
+and payload size raw, gzipped and — if brotli is installed — brotli'd.
+
+Usage:
+    python tests/bench_payload.py [--files N] [--per-page N] [--runs N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+from bench_search import build_fixture
+
+COMPACT_FIELDS = "filename,domain,modified,metadata.subject,metadata.from,metadata.priority"
+
+
+def best_ms(func, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list payload size and serialization")
+    parser.add_argument("--files", type=int, default=2_000)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    build_fixture(root, args.files)
+    os.environ["VAULT_PATH"] = str(root)
+
+    # Imported after VAULT_PATH points at the fixture
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from api.utils import compression, payload
+    from api.utils.file_parser import query_vault_files
+    from config import PENDING_APPROVAL
+
+    items, total = query_vault_files(PENDING_APPROVAL, limit=args.per_page)
+    page = {"items": items, "total": total, "page": 1, "per_page": args.per_page}
+    compact = {**page, "items": payload.select_fields(items, payload.parse_fields(COMPACT_FIELDS))}
+
+    def stdlib_fast(content):
+        saved, payload.orjson = payload.orjson, None
+        try:
+            return payload.FastJSONResponse(content).body
+        finally:
+            payload.orjson = saved
+
+    cases = [
+        ("before: jsonable_encoder + json", lambda: JSONResponse(jsonable_encoder(page)).body),
+        ("after: FastJSONResponse, stdlib", lambda: stdlib_fast(page)),
+        ("after: FastJSONResponse" + (", orjson" if payload.orjson else ""), lambda: payload.FastJSONResponse(page).body),
+        ("after: + ?fields= compact", lambda: payload.FastJSONResponse(compact).body),
+    ]
+    encodings = ["gzip"] + (["br"] if compression.brotli else [])
+
+    print(f"{len(items)} items per page, best of {args.runs} runs")
+    print(f"  {'':<36} {'serialize':>10} {'raw':>9}" + "".join(f" {e:>9}" for e in encodings))
+    for label, render in cases:
+        body = render()
+        sizes = "".join(f" {len(compression.compress(body, e)):9,d}" for e in encodings)
+        print(f"  {label:<36} {best_ms(render, args.runs):8.2f}ms {len(body):9,d}{sizes}")
+    body = payload.FastJSONResponse(page).body
+    for e in encodings:
+        print(f"  {e} compress time (full page): {best_ms(lambda: compression.compress(body, e), args.runs):.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
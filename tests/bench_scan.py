@@ -0,0 +1,74 @@
+"""
+WEBXES Tech — Cold listing benchmark
+
+Builds a synthetic Pending_Approval/ (default 5,000 files, using
+bench_search.build_fixture) and times the first list_vault_files() call —
+which has to build the vault index by reading every file — with the serial
+reader and with the thread-pool reader, checking both produce identical
+listings.
+
+The pool is off by default (VAULT_INDEX_SCAN_WORKERS=1): on a local disk
+it is slower than the serial reader. --latency-ms adds a fixed delay to
+each file read to emulate a network or cloud-synced drive, where it wins.
+
+Usage:
+    python tests/bench_scan.py [--files N] [--workers N] [--latency-ms MS]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+from bench_search import build_fixture
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold list_vault_files scans")
+    parser.add_argument("--files", type=int, default=5_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    build_fixture(root, args.files, {"Pending_Approval": 1})
+    os.environ["VAULT_PATH"] = str(root)
+
+    # Imported after VAULT_PATH points at the fixture
+    from api.utils import vault_index
+    from api.utils.file_parser import list_vault_files
+    from config import PENDING_APPROVAL, LOGS
+
+    if args.latency_ms:
+        read_document = vault_index.read_document
+
+        def slow_read(path, *a, **kw):
+            time.sleep(args.latency_ms / 1000)
+            return read_document(path, *a, **kw)
+
+        vault_index.read_document = slow_read
+
+    listings = {}
+    for label, workers in (("serial", 1), (f"{args.workers} workers", args.workers)):
+        vault_index.SCAN_WORKERS = workers
+        db = LOGS / f"bench_{workers}.db"
+        vault_index._index = vault_index.VaultIndex(db)
+        start = time.perf_counter()
+        items = list_vault_files(PENDING_APPROVAL)
+        elapsed = time.perf_counter() - start
+        listings[label] = [(i["path"], i["metadata"], i["preview"]) for i in items]
+        print(f"  {label:<12} {len(items):6d} files {elapsed:7.2f}s")
+        vault_index._index._conn.close()
+
+    serial, parallel = listings.values()
+    print("Listings identical" if serial == parallel else "Listings DIFFER")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+WEBXES Tech — Vault search benchmark
+
+Builds a synthetic vault (default 10,000 files split across Needs_Action/,
+Pending_Approval/ and Done/) from the real markdown in this vault, indexes
+it, then times representative /api/search queries against the vault index
+and checks that cursor pagination returns exactly the same rows as a
+single large page.
+
+Usage:
+    python tests/bench_search.py [--files N] [--runs N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+CASES = [
+    {"q": "invoice"},
+    {"q": "thank", "sort": "relevance"},
+    {"q": '"new project"'},
+    {"sender": "gmail"},
+    {"subject": "re:", "sort": "-filename"},
+    {"q": "re", "sender": "linkedin", "sort": "-subject"},
+    {},
+]
+
+
+# Default share of fixture files per folder (20/40/40)
+FOLDER_WEIGHTS = {"Needs_Action": 1, "Pending_Approval": 2, "Done": 2}
+
+
+def build_fixture(root: Path, total: int, weights: dict = None):
+    """Fill root with `total` copies of real vault files, split by folder weight.
+
+    The last folder in `weights` takes any rounding remainder.
+    """
+    weights = weights or FOLDER_WEIGHTS
+    sources = [p for d in ("Pending_Approval", "Done", "Needs_Action") for p in (VAULT_ROOT / d).rglob("*.md")]
+    if not sources:
+        sys.exit("No source markdown found in the vault to build a fixture from")
+    random.seed(7)
+    folders = list(weights)
+    split = {f: total * weights[f] // sum(weights.values()) for f in folders[:-1]}
+    split[folders[-1]] = total - sum(split.values())
+    for folder, count in split.items():
+        (root / folder).mkdir(parents=True)
+        for i in range(count):
+            src = random.choice(sources)
+            text = src.read_text(encoding="utf-8")
+            (root / folder / f"{src.stem}_{i}.md").write_text(f"{text}\nref-{i}\n", encoding="utf-8")
+    (root / "Logs").mkdir()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vault search")
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    root = Path(tmp.name)
+    build_fixture(root, args.files)
+    os.environ["VAULT_PATH"] = str(root)
+
+    # Imported after VAULT_PATH points at the fixture
+    from api.utils.vault_index import VaultIndex
+    from config import NEEDS_ACTION, PENDING_APPROVAL, DONE, LOGS
+
+    index = VaultIndex(LOGS / "vault_index.db")
+    dirs = [NEEDS_ACTION, PENDING_APPROVAL, DONE]
+    start = time.perf_counter()
+    for d in dirs:
+        index.reconcile(d)
+    print(f"Indexed {args.files} files in {time.perf_counter() - start:.1f}s")
+    print(f"Best of {args.runs} runs, 20 results per page:")
+
+    for case in CASES:
+        best = float("inf")
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = index.search(dirs, limit=20, **case)
+            best = min(best, time.perf_counter() - start)
+        print(f"  {str(case):<58} {result['total']:6d} hits {best * 1000:7.1f} ms")
+
+    print("Cursor pagination vs single page:")
+    for case in ({"q": "thank", "sort": "relevance"}, {"sort": "subject"}, {"sender": "gmail", "sort": "-priority"}):
+        full = [i["path"] for i in index.search(dirs, limit=args.files, **case)["items"]]
+        walked, cursor = [], None
+        while True:
+            page = index.search(dirs, limit=37, cursor=cursor, **case)
+            walked += [i["path"] for i in page["items"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        print(f"  {str(case):<58} {'OK' if walked == full else 'MISMATCH'} ({len(full)} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+WEBXES Tech — Email body extraction checks
+
+Runs email_body.extract_body over hand-built Gmail payload fixtures —
+nested multipart/mixed > alternative > related trees, HTML-only mail,
+attachments, non-UTF-8 charsets, corrupt base64 — and checks the text and
+the reported source part of each, plus the character budget cut-off and
+markup split across decode chunks. Exits non-zero on any failure.
+
+Usage:
+    python tests/check_email_body.py
+"""
+
+import base64
+import sys
+from pathlib import Path
+
+VAULT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(VAULT_ROOT))
+
+import email_body
+from email_body import MAX_BODY_CHARS, extract_body
+
+
+# ── Fixtures ──────────────────────────────────────────────────────────────────
+
+def leaf(mime: str, text: str = '', charset: str = 'utf-8', filename: str = '',
+         raw: str = None) -> dict:
+    data = raw if raw is not None else (
+        base64.urlsafe_b64encode(text.encode(charset)).decode().rstrip('='))
+    return {
+        'mimeType': mime,
+        'filename': filename,
+        'headers': [{'name': 'Content-Type', 'value': f'{mime}; charset="{charset}"'}],
+        'body': {'size': len(data), 'data': data},
+    }
+
+
+def multipart(mime: str, *parts: dict) -> dict:
+    return {'mimeType': mime, 'filename': '', 'headers': [], 'body': {'size': 0}, 'parts': list(parts)}
+
+
+def message(payload: dict, snippet: str = 'snippet text') -> dict:
+    """Number parts the way Gmail does: children of the root are 0, 1, ...; then 0.0, 0.1, ..."""
+    def number(part, part_id):
+        part['partId'] = part_id
+        for i, child in enumerate(part.get('parts', [])):
+            number(child, f'{part_id}.{i}' if part_id else str(i))
+    number(payload, '')
+    return {'id': 'm1', 'snippet': snippet, 'payload': payload}
+
+
+def newsletter_html(kb: int) -> str:
+    head = '<html><head><style>' + '.c{color:#333;padding:0}' * 200 + '</style></head><body>'
+    row = ('<tr><td class="c"><a href="https://example.com/track?id=123">Story&nbsp;headline</a>'
+           '<p>Some <b>bold</b> summary text for the week&#39;s digest.</p></td></tr>')
+    rows = row * (kb * 1024 // len(row))
+    return f'{head}<table>{rows}</table></body></html>'
+
+
+FIXTURES = [
+    ('simple text/plain', message(leaf('text/plain', 'Hi,\nplease send the invoice.')),
+     'Hi,\nplease send the invoice.', 'text/plain part root'),
+    ('simple text/html (now stripped)',
+     message(leaf('text/html', '<p>Hello <b>there</b></p><p>Bye</p>')),
+     'Hello there\nBye', 'text/html part root'),
+    ('alternative prefers plain',
+     message(multipart('multipart/alternative',
+                       leaf('text/plain', 'Plain version'),
+                       leaf('text/html', '<p>HTML version</p>'))),
+     'Plain version', 'text/plain part 0'),
+    ('mixed > alternative > related, with attachments',
+     message(multipart('multipart/mixed',
+                       multipart('multipart/alternative',
+                                 leaf('text/plain', 'Nested plain body. '),
+                                 multipart('multipart/related',
+                                           leaf('text/html', '<p>nested html</p>'),
+                                           leaf('image/png', 'PNGDATA'))),
+                       leaf('text/plain', 'ATTACHED NOTES', filename='notes.txt'),
+                       leaf('text/plain', 'Second inline part.'))),
+     'Nested plain body. Second inline part.', 'text/plain parts 0.0, 2'),
+    ('html only, nested, hidden elements dropped',
+     message(multipart('multipart/mixed',
+                       multipart('multipart/related',
+                                 leaf('text/html', '<html><head><title>T</title><style>p{x:1}</style>'
+                                                   '</head><body><script>var a=1;</script>'
+                                                   '<div>Line&nbsp;one &amp; more</div>'
+                                                   '<ul><li>a</li><li>b</li></ul></body></html>'),
+                                 leaf('image/gif', 'GIF')),
+                       leaf('application/pdf', 'PDF', filename='q.pdf'))),
+     'Line one & more\na\nb', 'text/html part 0.0'),
+    ('comments, raw script text, quoted ">", entities, stray "<"',
+     message(leaf('text/html', '<p>A&amp;B &#39;x&#39; AT&T <a href="x>y">link</a></p>'
+                               '<!-- c <b> --><script>if(a<b){"</div>"}</script>'
+                               '<STYLE>p>a{}</STYLE>Tail&nbsp;end<br/>last a < b')),
+     "A&B 'x' AT&T link\nTail end\nlast a < b", 'text/html part root'),
+    ('upper-case markup, text that changes length when lower-cased',
+     message(leaf('text/html', '<P>İstanbul</P><Script>x</SCRIPT><TD>Two</TD><TITLE>hidden')),
+     'İstanbul\nTwo', 'text/html part root'),
+    ('unclosed <head>, Outlook conditionals, unknown marked section',
+     message(leaf('text/html', '<head><title>T</title><body><p>Hi<![if !vml]>,<![endif]></p>'
+                               '<![foo[ junk ]]><br>Bye')),
+     'Hi,\nBye', 'text/html part root'),
+    ('latin-1 charset',
+     message(leaf('text/plain', 'Café déjà vu', charset='iso-8859-1')),
+     'Café déjà vu', 'text/plain part root'),
+    ('corrupt base64 falls back to nothing readable',
+     message(multipart('multipart/alternative', leaf('text/plain', raw='@@@@'))),
+     '', 'text/plain part 0'),
+    ('no text parts uses snippet',
+     message(multipart('multipart/mixed', leaf('image/png', 'PNG'))),
+     'snippet text', 'snippet'),
+]
+
+
+def check_fixtures() -> bool:
+    ok = True
+    for name, msg, text, source in FIXTURES:
+        body = extract_body(msg)
+        passed = body.text == text and body.source == source
+        ok &= passed
+        print(f"  {'ok  ' if passed else 'FAIL'} {name}")
+        if not passed:
+            print(f"       got  {body.text!r} from {body.source!r}")
+            print(f"       want {text!r} from {source!r}")
+
+    # Budget cut-off: long plain text and long HTML both stop at MAX_BODY_CHARS
+    long_plain = extract_body(message(leaf('text/plain', 'x' * 100_000)))
+    newsletter = newsletter_html(200)
+    long_html = extract_body(message(leaf('text/html', newsletter)))
+    cut = (len(long_plain.text) == MAX_BODY_CHARS and long_plain.truncated
+           and len(long_html.text) == MAX_BODY_CHARS and long_html.truncated)
+    ok &= cut
+    print(f"  {'ok  ' if cut else 'FAIL'} cut off at {MAX_BODY_CHARS} chars")
+
+    # Stopping early gives the same text as converting the whole part
+    whole = email_body.html_to_text(newsletter)[:MAX_BODY_CHARS]
+    early_ok = long_html.text == whole
+    ok &= early_ok
+    print(f"  {'ok  ' if early_ok else 'FAIL'} early cut-off matches whole-document text")
+
+    # Tags, comments, hidden elements and entities split across decode
+    # chunks must come out the same
+    msgs = [msg for _, msg, _, _ in FIXTURES] + [message(leaf('text/html', newsletter))]
+    expected = [extract_body(msg) for msg in msgs]
+    chunk_chars = email_body.CHUNK_CHARS
+    try:
+        split_ok = True
+        for size in (4, 8, 12, 20, 400):
+            email_body.CHUNK_CHARS = size
+            split_ok &= [extract_body(msg) for msg in msgs] == expected
+    finally:
+        email_body.CHUNK_CHARS = chunk_chars
+    ok &= split_ok
+    print(f"  {'ok  ' if split_ok else 'FAIL'} same result with tiny decode chunks")
+    return ok
+
+
+def main():
+    print("Fixtures:")
+    ok = check_fixtures()
+    print("All checks passed" if ok else "Some checks FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+WEBXES Tech — In-memory fake of the Gmail API service
+
+Mimics the slice of the googleapiclient Gmail v1 service the watcher uses:
+
+    service.users().getProfile(userId='me').execute()
+    service.users().messages().list(userId, q, maxResults, pageToken).execute()
+    service.users().messages().get(userId, id, format, metadataHeaders).execute()
+    service.users().history().list(userId, startHistoryId, historyTypes,
+                                   pageToken, maxResults).execute()
+    batch = service.new_batch_http_request(callback=...)
+    batch.add(request, callback=None, request_id=None); batch.execute()
+
+Every HTTP round trip is counted in `calls` (a batch counts once, as
+"batch", with its parts under "<name> (batched)") and can be given a fixed
+`latency`, so scripts can compare API cost and wall time. Pass
+`FakeGmail()` as GmailWatcher(service=...).
+
+    gmail = FakeGmail(latency=0.05)
+    gmail.add_message('Ali <ali@client.pk>', 'Invoice', 'Please see attached')
+    gmail.expire_history()   # next history.list raises HttpError 404
+    gmail.rate_limit(10)     # next 10 batched calls fail with HttpError 429
+
+Only is:unread is honoured in list queries (SPAM/TRASH are hidden unless
+includeSpamTrash, as in Gmail); other search terms are ignored.
+"""
+
+import base64
+import itertools
+import time
+from collections import Counter
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+PAGE_SIZE = 100
+
+
+def _http_error(status: int, message: str) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), message.encode())
+
+
+class _Request:
+    def __init__(self, gmail: "FakeGmail", name: str, func):
+        self._gmail = gmail
+        self.name = name
+        self.func = func
+
+    def execute(self):
+        self._gmail.calls[self.name] += 1
+        self._gmail.round_trip()
+        return self.func()
+
+
+class _Batch:
+    """Stand-in for googleapiclient.http.BatchHttpRequest."""
+
+    def __init__(self, gmail: "FakeGmail", callback=None):
+        self._gmail = gmail
+        self._callback = callback
+        self._parts = []
+
+    def add(self, request: _Request, callback=None, request_id=None):
+        request_id = request_id or str(len(self._parts) + 1)
+        if any(rid == request_id for _, _, rid in self._parts):
+            raise KeyError(f"Duplicate request_id {request_id}")
+        if len(self._parts) >= 100:
+            raise ValueError("A batch holds at most 100 requests")
+        self._parts.append((request, callback, request_id))
+
+    def execute(self):
+        self._gmail.calls["batch"] += 1
+        self._gmail.round_trip()
+        for request, callback, request_id in self._parts:
+            self._gmail.calls[f"{request.name} (batched)"] += 1
+            response, exception = None, None
+            if self._gmail.rate_limited > 0:
+                self._gmail.rate_limited -= 1
+                exception = _http_error(429, "rateLimitExceeded")
+            else:
+                try:
+                    response = request.func()
+                except HttpError as e:
+                    exception = e
+            (callback or self._callback)(request_id, response, exception)
+
+
+def _page(items: list, page_token, max_results) -> tuple[list, dict]:
+    start = int(page_token or 0)
+    size = max_results or PAGE_SIZE
+    extra = {"nextPageToken": str(start + size)} if start + size < len(items) else {}
+    return items[start:start + size], extra
+
+
+class FakeGmail:
+    """Mailbox of messages plus a messageAdded history log."""
+
+    def __init__(self, start_history_id: int = 1000, latency: float = 0.0):
+        self.latency = latency
+        self.rate_limited = 0
+        self.mailbox: dict[str, dict] = {}
+        # (history id, message stub as delivered) per added message, oldest first
+        self.added: list[tuple[int, dict]] = []
+        self.history_id = start_history_id
+        self.oldest_history_id = start_history_id
+        self.calls: Counter = Counter()
+        self._ids = itertools.count(1)
+
+    # ── Mailbox setup ─────────────────────────────────────────────────
+
+    def add_message(self, sender: str, subject: str, body: str = "",
+                    labels=("INBOX", "UNREAD"), headers: dict = None) -> str:
+        """Deliver a message and record it in history; returns its ID."""
+        message_id = f"{next(self._ids):016x}"
+        all_headers = {"From": sender, "To": "me@webxes.tech", "Subject": subject,
+                       "Date": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime())}
+        all_headers.update(headers or {})
+        self.history_id += 1
+        self.mailbox[message_id] = {
+            "id": message_id,
+            "threadId": message_id,
+            "labelIds": list(labels),
+            "snippet": body[:100],
+            "historyId": str(self.history_id),
+            "payload": {
+                "mimeType": "text/plain",
+                "headers": [{"name": k, "value": v} for k, v in all_headers.items()],
+                "body": {"data": base64.urlsafe_b64encode(body.encode()).decode()},
+            },
+        }
+        self.added.append((self.history_id, {
+            "id": message_id, "threadId": message_id, "labelIds": list(labels),
+        }))
+        return message_id
+
+    def mark_read(self, message_id: str):
+        self.mailbox[message_id]["labelIds"].remove("UNREAD")
+
+    def delete_message(self, message_id: str):
+        """Remove a message; later gets fail with 404 (history still lists it)."""
+        del self.mailbox[message_id]
+
+    def round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def rate_limit(self, count: int):
+        """Fail the next `count` batched calls with 429 rateLimitExceeded."""
+        self.rate_limited = count
+
+    def expire_history(self):
+        """Drop history before now, as Gmail does after about a week."""
+        self.oldest_history_id = self.history_id
+
+    # ── API surface ───────────────────────────────────────────────────
+
+    def users(self):
+        return self
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+    def getProfile(self, userId="me"):
+        return _Request(self, "getProfile", lambda: {
+            "emailAddress": "me@webxes.tech",
+            "messagesTotal": len(self.mailbox),
+            "historyId": str(self.history_id),
+        })
+
+    def messages(self):
+        return _Messages(self)
+
+    def history(self):
+        return _History(self)
+
+
+class _Messages:
+    def __init__(self, gmail: FakeGmail):
+        self._g = gmail
+
+    def list(self, userId="me", q="", maxResults=None, pageToken=None,
+             includeSpamTrash=False, **_):
+        def run():
+            hidden = set() if includeSpamTrash else {"SPAM", "TRASH"}
+            found = [
+                {"id": m["id"], "threadId": m["threadId"]}
+                for m in reversed(list(self._g.mailbox.values()))
+                if ("is:unread" not in q or "UNREAD" in m["labelIds"])
+                and not hidden & set(m["labelIds"])
+            ]
+            page, extra = _page(found, pageToken, maxResults)
+            return {"messages": page, "resultSizeEstimate": len(found), **extra}
+        return _Request(self._g, "messages.list", run)
+
+    def get(self, userId="me", id=None, format="full", metadataHeaders=None, **_):
+        def run():
+            message = self._g.mailbox.get(id)
+            if message is None:
+                raise _http_error(404, "Not Found")
+            if format == "metadata":
+                headers = message["payload"]["headers"]
+                if metadataHeaders:
+                    wanted = {h.lower() for h in metadataHeaders}
+                    headers = [h for h in headers if h["name"].lower() in wanted]
+                return {**message, "payload": {"mimeType": message["payload"]["mimeType"], "headers": headers}}
+            return message
+        return _Request(self._g, "messages.get", run)
+
+
+class _History:
+    def __init__(self, gmail: FakeGmail):
+        self._g = gmail
+
+    def list(self, userId="me", startHistoryId=None, historyTypes=None,
+             pageToken=None, maxResults=None, **_):
+        def run():
+            start = int(startHistoryId)
+            if start < self._g.oldest_history_id:
+                raise _http_error(404, "historyId expired")
+            records = [
+                {"id": str(hid), "messagesAdded": [{"message": dict(stub)}]}
+                for hid, stub in self._g.added if hid > start
+            ]
+            page, extra = _page(records, pageToken, maxResults)
+            return {"history": page, "historyId": str(self._g.history_id), **extra}
+        return _Request(self._g, "history.list", run)
@@ -26,9 +26,11 @@ sys.path.insert(0, str(VAULT_ROOT))
 
 from config import (
     VAULT_PATH, NEEDS_ACTION, DONE, UPDATES, SIGNALS,
-    IN_PROGRESS_CLOUD, APPROVED, LOGS, ensure_dirs,
+    IN_PROGRESS_CLOUD, APPROVED, ensure_dirs,
 )
 
+from audit_store import segment_path
+
 # Force DRY_RUN for safety
 import os
 os.environ["DRY_RUN"] = "true"
@@ -166,8 +168,8 @@ WEBXES Tech Team
     # ── Step 6: Verify audit trail ──
     step(6, "Verify audit trail")
 
-    audit_file = LOGS / "audit.jsonl"
-    check(audit_file.exists(), "audit.jsonl exists")
+    audit_file = segment_path(datetime.now().date().isoformat())
+    check(audit_file.exists(), f"audit/{audit_file.name} exists")
 
     audit_lines = audit_file.read_text(encoding="utf-8").strip().split("\n")
     recent_events = []
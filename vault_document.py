@@ -0,0 +1,115 @@
+"""
+WEBXES Tech — Vault document parser
+
+One frontmatter parser shared by the dashboard API, cloud agent, approval
+watcher and local sync.
+
+read_document(path) streams the file in READ_BLOCK chunks only as far as
+the closing --- plus PREVIEW_BYTES of the body, so listings and
+metadata-only callers never load whole large files. The full body is read
+lazily the first time VaultDocument.body is accessed.
+
+Grammar (deliberately lenient — vault files are written by many tools):
+  - the first line is --- (a UTF-8 BOM and trailing spaces are ignored)
+  - the block ends at the next line that is --- or ... ; with no closing
+    line the file has no frontmatter and is all body
+  - each "key: value" line splits at the first colon; keys and values are
+    stripped, values are kept verbatim otherwise (no YAML typing/quoting)
+  - blank lines, # comments and lines without a colon are skipped
+  - CRLF and CR line endings read the same as LF
+"""
+
+import re
+from pathlib import Path
+from typing import Iterable, Optional
+
+PREVIEW_BYTES = 1024
+# Files are read in blocks of this size; most vault files fit in one
+READ_BLOCK = 4096
+
+_BOM = "\ufeff"
+_CLOSERS = ("---", "...")
+_CLOSING_LINE = re.compile(rb"^[ \t]*(?:---|\.\.\.)[ \t]*\r?$", re.MULTILINE)
+
+
+def _normalize(text: str) -> str:
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def parse_metadata(lines: Iterable[str]) -> dict:
+    """Parse frontmatter key/value lines (without the --- delimiters)."""
+    metadata = {}
+    for line in lines:
+        key, sep, value = line.partition(":")
+        key = key.strip()
+        if sep and key and key[0] != "#":
+            metadata[key] = value.strip()
+    return metadata
+
+
+def split_frontmatter(text: str) -> tuple[dict, str]:
+    """Split in-memory document text into (metadata, body)."""
+    lines = _normalize(text.lstrip(_BOM)).split("\n")
+    if not lines or lines[0].strip() != "---":
+        return {}, text.strip()
+    for i, line in enumerate(lines[1:], start=1):
+        if line.strip() in _CLOSERS:
+            return parse_metadata(lines[1:i]), "\n".join(lines[i + 1:]).strip()
+    return {}, text.strip()
+
+
+class VaultDocument:
+    """Frontmatter and preview of a vault file, with the body read on demand."""
+
+    def __init__(self, path: Path, metadata: dict, preview: str, body_offset: int):
+        self.path = path
+        self.metadata = metadata
+        self.preview = preview
+        self._body_offset = body_offset
+        self._body: Optional[str] = None
+
+    @property
+    def body(self) -> str:
+        """The document body after the frontmatter, stripped."""
+        if self._body is None:
+            with open(self.path, "rb") as f:
+                f.seek(self._body_offset)
+                self._body = _normalize(f.read().decode("utf-8")).strip()
+        return self._body
+
+
+def read_document(path: Path, preview_bytes: int = PREVIEW_BYTES) -> VaultDocument:
+    """Read a vault file's frontmatter and the first preview_bytes of its body."""
+    if not isinstance(path, Path):
+        path = Path(path)
+    with open(path, "rb") as f:
+        buf = f.read(READ_BLOCK)
+        eof = len(buf) < READ_BLOCK
+        metadata: dict = {}
+        body_offset = 0
+
+        first_end = buf.find(b"\n")
+        opening = buf if first_end < 0 else buf[:first_end]
+        if opening.decode("utf-8").lstrip(_BOM).strip() == "---" and first_end >= 0:
+            # Pull in more blocks only for unusually long headers
+            while True:
+                close = _CLOSING_LINE.search(buf, first_end + 1)
+                if close or eof:
+                    break
+                more = f.read(READ_BLOCK)
+                eof = len(more) < READ_BLOCK
+                buf += more
+            if close:
+                header = buf[first_end + 1:close.start()].decode("utf-8")
+                metadata = parse_metadata(header.splitlines())
+                newline = buf.find(b"\n", close.end())
+                body_offset = len(buf) if newline < 0 else newline + 1
+
+        chunk = buf[body_offset:body_offset + preview_bytes]
+        if len(chunk) < preview_bytes and not eof:
+            f.seek(body_offset + len(chunk))
+            chunk += f.read(preview_bytes - len(chunk))
+
+    # errors="ignore" drops a multi-byte character cut at the chunk edge
+    preview = _normalize(chunk.decode("utf-8", errors="ignore")).strip()
+    return VaultDocument(path, metadata, preview, body_offset)
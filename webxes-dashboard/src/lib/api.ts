@@ -62,6 +62,22 @@ export const approveItem = (id: string, note?: string) =>
 export const rejectItem = (id: string, note?: string) =>
   api.post(`/api/approvals/${id}/reject`, { note: note || '' });
 
+export interface BulkApprovalRequest {
+  action: 'approve' | 'reject';
+  ids?: string[];
+  domain?: string;
+  older_than_hours?: number;
+  sender?: string;
+  note?: string;
+}
+
+export const bulkApprovalAction = (body: BulkApprovalRequest) =>
+  api.post('/api/approvals/bulk', body);
+
+// Search
+export const searchVault = (params?: Record<string, string | number>) =>
+  api.get('/api/search', { params });
+
 // Social Media
 export const generateSocialPost = (message: string) =>
   api.post('/api/social/generate', { message });
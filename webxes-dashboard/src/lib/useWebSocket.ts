@@ -1,6 +1,7 @@
 'use client';
 
 import { useEffect, useRef, useCallback } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
 import { create } from 'zustand';
 import { useToastStore } from '@/components/Toast';
 
@@ -14,6 +15,13 @@ interface WSEvent {
   timestamp?: string;
 }
 
+interface WSFrame {
+  type: string;
+  epoch?: string;
+  seq?: number;
+  events?: WSEvent[];
+}
+
 interface NotificationStore {
   events: WSEvent[];
   unreadCount: number;
@@ -63,8 +71,17 @@ function getToastMessage(data: WSEvent): string {
   return action;
 }
 
+function refreshVaultQueries(queryClient: ReturnType<typeof useQueryClient>) {
+  queryClient.invalidateQueries({ queryKey: ['approvals'] });
+  queryClient.invalidateQueries({ queryKey: ['inbox'] });
+  queryClient.invalidateQueries({ queryKey: ['dashboard-stats'] });
+}
+
 export function useWebSocket() {
   const wsRef = useRef<WebSocket | null>(null);
+  // Last frame seen, so a reconnect only receives what was missed
+  const cursorRef = useRef<{ epoch: string; seq: number } | null>(null);
+  const queryClient = useQueryClient();
   const addEvent = useNotificationStore((s) => s.addEvent);
   const setConnected = useNotificationStore((s) => s.setConnected);
 
@@ -72,7 +89,9 @@ export function useWebSocket() {
     const token = localStorage.getItem('webxes_token');
     if (!token) return;
 
-    const ws = new WebSocket(`${WS_URL}/api/ws?token=${token}`);
+    const cursor = cursorRef.current;
+    const resume = cursor ? `&epoch=${cursor.epoch}&since=${cursor.seq}` : '';
+    const ws = new WebSocket(`${WS_URL}/api/ws?token=${token}${resume}`);
 
     ws.onopen = () => {
       console.log('WebSocket connected');
@@ -81,11 +100,26 @@ export function useWebSocket() {
 
     ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
-        if (data.type !== 'pong') {
-          addEvent(data);
-          const msg = getToastMessage(data);
+        const data: WSFrame = JSON.parse(event.data);
+        if (data.type === 'hello') {
+          if (!cursorRef.current) {
+            cursorRef.current = { epoch: data.epoch!, seq: data.seq! };
+          }
+        } else if (data.type === 'resync') {
+          cursorRef.current = { epoch: data.epoch!, seq: data.seq! };
+          refreshVaultQueries(queryClient);
+        } else if (data.type === 'batch') {
+          const prev = cursorRef.current;
+          if (prev && prev.epoch === data.epoch && data.seq! <= prev.seq) return; // already seen
+          cursorRef.current = { epoch: data.epoch!, seq: data.seq! };
+          const events = data.events || [];
+          events.forEach(addEvent);
+          const msg = events.length === 1 ? getToastMessage(events[0]) : `${events.length} vault changes`;
           useToastStore.getState().addToast('info', msg);
+          refreshVaultQueries(queryClient);
+        } else if (data.type !== 'pong') {
+          addEvent(data as WSEvent);
+          useToastStore.getState().addToast('info', getToastMessage(data as WSEvent));
         }
       } catch {
         // ignore parse errors
@@ -116,7 +150,7 @@ export function useWebSocket() {
       clearInterval(pingInterval);
       ws.close();
     };
-  }, [addEvent, setConnected]);
+  }, [addEvent, setConnected, queryClient]);
 
   useEffect(() => {
     const cleanup = connect();